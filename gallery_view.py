@@ -4,20 +4,47 @@
 # ============================================================
 
 import customtkinter as ctk
+import tkinter as tk
 from tkinter import filedialog
+import gc
 import os
+import threading
+from collections import OrderedDict
 from PIL import Image
-from utils import generate_video_prev
+from models import DataManager
+from utils import (get_cached_prev, copy_video_file, warm_preview_cache, unique_filename, prune_preview_cache,
+                   PREVIEW_RESAMPLE, LIBRARY_FORMATS, NEXT_PREVIEW_SIZE, CELL_PREVIEW_SIZE, THUMB_EXECUTOR)
 
 
 class GalleryView(ctk.CTkFrame):
     """Video library view"""
 
+    GRID_COLUMNS = 3  # Cards per grid row
+    RENDER_BATCH = 12  # Cards built per scroll step
+    IMG_CACHE_SIZE = 256  # Previews kept in memory
+    PREVIEW_SIZE = (230, 150)  # Decoded size, smaller previews are scaled from it
+    DEBUG_GC = False  # Collect and report garbage after each reload
+
+    _img_cache = OrderedDict()  # (filename, size, mtime) -> (PIL image, CTkImage), shared by all views
+    _cache_pruned = False  # Disk preview cache cleaned this run
+
     def __init__(self, master):
         super().__init__(master)
 
         self.gallery_path = "data/gallery"  # Video storage path
         self.view_mode = "list"  # Display mode
+        self._thumb_futures = []  # Pending preview jobs
+        self._video_files = []  # Entries shown in gallery
+        self._rendered = 0  # Entries with widgets
+        self._render_pending = False  # Batch scheduled
+        self._grid_container = None  # Grid parent frame
+        self._cards = {}  # filename -> card widget
+
+        # Fonts shared by all cards
+        self._placeholder_font_big = ctk.CTkFont(size=48)  # Grid placeholder
+        self._placeholder_font_small = ctk.CTkFont(size=24)  # List placeholder
+        self._name_font = ctk.CTkFont(size=12)  # Grid name
+        self._name_font_list = ctk.CTkFont(size=14)  # List name
 
         # Top panel
         self.create_top_panel()
@@ -25,6 +52,7 @@ class GalleryView(ctk.CTkFrame):
         # Scrollable area for videos
         self.videos_frame = ctk.CTkScrollableFrame(self)  # Scrollable container
         self.videos_frame.pack(fill="both", expand=True, pady=10)
+        self.videos_frame._parent_canvas.configure(yscrollcommand=self._on_scroll)  # Lazy card building
 
         # Load videos
         self.load_videos()
@@ -63,6 +91,10 @@ class GalleryView(ctk.CTkFrame):
         )
         btn_toggle_view.pack(side="right", padx=10)
 
+        # Copy progress
+        self.status_label = ctk.CTkLabel(top_panel, text="", text_color="gray")
+        self.status_label.pack(side="right", padx=10)
+
     def setup_drag_drop(self):
         #Setup drag & drop (basic implementation)
         pass
@@ -83,44 +115,99 @@ class GalleryView(ctk.CTkFrame):
             self.add_videos(filenames)  # Copy selected files
 
     def add_videos(self, file_paths):
-        #Add video files to library
+        #Add video files to library (copied in background thread)
         os.makedirs(self.gallery_path, exist_ok=True)  # Create folder
 
+        jobs = []  # (source, destination) pairs
+        with os.scandir(self.gallery_path) as it:
+            existing = {entry.name for entry in it}  # Taken names, incl. this batch
         for file_path in file_paths:
-            # Copy file to gallery
-            filename = os.path.basename(file_path)  # Get filename only
+            # Copy file to gallery, add number if file exists
+            filename = unique_filename(os.path.basename(file_path), existing)
+            existing.add(filename)
             dest_path = os.path.join(self.gallery_path, filename)  # Destination path
+            jobs.append((file_path, dest_path))
+
+        # Copy files without blocking the window
+        self.status_label.configure(text=f"Copying 0/{len(jobs)}...")  # Progress
+        threading.Thread(target=self._copy_videos, args=(jobs,)).start()
+
+    def _copy_videos(self, jobs):
+        #Copy videos to gallery (runs in worker thread)
+        added = []  # Filenames copied successfully
+        for i, (file_path, dest_path) in enumerate(jobs, 1):
+            try:
+                copy_video_file(file_path, dest_path)  # Kernel copy where possible
+            except OSError as e:
+                print(f"Copy error: {e}")  # Print error
+            else:
+                added.append(os.path.basename(dest_path))
+                warm_preview_cache(dest_path, (self.PREVIEW_SIZE, NEXT_PREVIEW_SIZE))  # Card and player previews
+            self._call_in_ui(self._show_copy_progress, f"Copying {i}/{len(jobs)}...")
+
+        self._call_in_ui(self._on_videos_added, added)  # Update display
+
+    def _show_copy_progress(self, text):
+        #Show copy progress if the view is still open
+        if self.winfo_exists():
+            self.status_label.configure(text=text)
+
+    def _call_in_ui(self, func, *args, **kwargs):
+        #Run function on Tk thread
+        try:
+            self.after(0, lambda: func(*args, **kwargs))
+        except (RuntimeError, tk.TclError):
+            pass  # Application closed
+
+    def _on_videos_added(self, added):
+        #Append copied videos without rebuilding existing cards
+        if not self.winfo_exists():  # View closed during copy
+            return
+        self.status_label.configure(text="")  # Hide progress
 
-            # Check if exists
-            if os.path.exists(dest_path):
-                # Add number if file exists
-                name, ext = os.path.splitext(filename)
-                counter = 1
-                while os.path.exists(dest_path):  # Find unique name
-                    filename = f"{name}_{counter}{ext}"  # Add counter
-                    dest_path = os.path.join(self.gallery_path, filename)
-                    counter += 1
+        if not self._video_files:  # Empty library label shown
+            self.load_videos()  # Full reload
+            return
 
-            # Copy file
-            import shutil
-            shutil.copy2(file_path, dest_path)
+        added = set(added)  # Fast lookup
+        with os.scandir(self.gallery_path) as it:  # Entries for new files only
+            new_entries = [e for e in it if e.name in added
+                           and os.path.splitext(e.name)[1].lower() in LIBRARY_FORMATS
+                           and e.is_file(follow_symlinks=False)]
 
-        # Update display
-        self.load_videos()  # Refresh video list
+        all_built = self._rendered == len(self._video_files)  # No lazy cards left
+        self._video_files.extend(new_entries)
+        if all_built:  # Otherwise built when scrolled into view
+            self.render_more()
 
     def load_videos(self):
         #Load and display all videos from gallery
+        for future in self._thumb_futures:  # Previews of old widgets
+            future.cancel()
+        self._thumb_futures = []
+
+        self._cards.clear()  # Drop widget references before destroying
+        self._grid_container = None
         for widget in self.videos_frame.winfo_children():
             widget.destroy()
+        self._video_files = []  # Nothing shown yet
+        self._rendered = 0
+        if self.DEBUG_GC:
+            print(f"Gallery GC: {gc.collect()} objects collected")  # Freed after teardown
 
         # Get list of video files
         if not os.path.exists(self.gallery_path):  # Check folder exists
             os.makedirs(self.gallery_path, exist_ok=True)  # Create if missing
 
-        video_files = []  # Empty list
-        for filename in os.listdir(self.gallery_path):  # Loop through files
-            if filename.lower().endswith(('.mp4', '.avi', '.mkv', '.mov')):  # Check extension
-                video_files.append(filename)  # Add to list
+        with os.scandir(self.gallery_path) as it:  # Directory entries with cached stat
+            video_files = [e for e in it
+                           if os.path.splitext(e.name)[1].lower() in LIBRARY_FORMATS and e.is_file(follow_symlinks=False)]
+
+        if not GalleryView._cache_pruned:  # Once per run, drop previews of deleted or changed videos
+            GalleryView._cache_pruned = True
+            video_paths = [e.path for e in video_files]
+            video_paths += [ex.video_path for w in DataManager.shared().load_workouts() for ex in w.exercises if ex]
+            THUMB_EXECUTOR.submit(prune_preview_cache, video_paths, (self.PREVIEW_SIZE, CELL_PREVIEW_SIZE, NEXT_PREVIEW_SIZE))
 
         if not video_files:  # Empty library
             label = ctk.CTkLabel(
@@ -131,73 +218,78 @@ class GalleryView(ctk.CTkFrame):
             label.pack(pady=50)
             return
 
-        # Display videos
+        # Display first batch, the rest is built while scrolling
+        self._video_files = video_files  # All gallery entries
+        if self.view_mode == "grid":  # Grid layout
+            self._grid_container = ctk.CTkFrame(self.videos_frame, fg_color="transparent")
+            self._grid_container.pack(fill="both", expand=True, padx=10, pady=10)
+            for c in range(self.GRID_COLUMNS):
+                self._grid_container.grid_columnconfigure(c, weight=1)
+        self.render_more()
+
+    def render_more(self):
+        #Build widgets for the next batch of videos
+        self._render_pending = False
+        start = self._rendered  # First entry without widget
+        end = min(start + self.RENDER_BATCH, len(self._video_files))  # Batch end
+        if start >= end:  # Everything built
+            return
+
         if self.view_mode == "grid":  # Grid layout
-            self.show_grid_view(video_files)
+            self.show_grid_view(self._video_files[start:end], start)
         else:  # List layout
-            self.show_list_view(video_files)
+            self.show_list_view(self._video_files[start:end])
+        self._rendered = end
 
-    def show_grid_view(self, video_files):
-        #Display videos in grid
-        grid_container = ctk.CTkFrame(self.videos_frame, fg_color="transparent")
-        grid_container.pack(fill="both", expand=True, padx=10, pady=10)
+    def _on_scroll(self, first, last):
+        #Scrollbar update, build more cards near the bottom
+        self.videos_frame._scrollbar.set(first, last)  # Default behaviour
+        if float(last) > 0.9 and not self._render_pending and self._rendered < len(self._video_files):
+            self._render_pending = True  # One batch at a time
+            self.after_idle(self.render_more)
 
-        # Arrange videos in grid (3 columns)
-        columns = 3  # Number of columns
-        for i, filename in enumerate(video_files):
+    def show_grid_view(self, video_files, start=0):
+        #Display videos in grid
+        columns = self.GRID_COLUMNS  # Number of columns
+        for i, entry in enumerate(video_files, start):
             row = i // columns  # Calculate row position
             col = i % columns  # Calculate column position
 
-            video_card = self.create_video_card_grid(grid_container, filename)
+            video_card = self.create_video_card_grid(self._grid_container, entry)
             video_card.grid(row=row, column=col, padx=10, pady=10, sticky="nsew")
-
-        for c in range(columns):
-            grid_container.grid_columnconfigure(c, weight=1)
+            self._cards[entry.name] = video_card  # Remember widget
 
     def show_list_view(self, video_files):
         #Display videos in list
-        for filename in video_files:  # Each video
-            video_row = self.create_video_row_list(filename)
+        for entry in video_files:  # Each video
+            video_row = self.create_video_row_list(entry)
             video_row.pack(fill="x", pady=5, padx=10)
+            self._cards[entry.name] = video_row  # Remember widget
 
-    def create_video_card_grid(self, parent, filename):
+    def create_video_card_grid(self, parent, entry):
         #Create video card for grid
         card = ctk.CTkFrame(parent, width=250, height=250)
 
-        video_path = os.path.join(self.gallery_path, filename)
+        filename = entry.name  # Video filename
 
         preview_frame = ctk.CTkFrame(card, width=230, height=150, fg_color="gray20")
         preview_frame.pack(pady=10, padx=10)
         preview_frame.pack_propagate(False)
 
-        # Try to create preview
-        try:
-            prev = generate_video_prev(video_path, size=(230, 150))  # Generate preview
-            if prev:
-                ctk_image = ctk.CTkImage(
-                    light_image=prev,
-                    dark_image=prev,
-                    size=prev.size
-                )
-                preview_label = ctk.CTkLabel(preview_frame, image=ctk_image, text="")
-                preview_label.image = ctk_image
-                preview_label.pack(expand=True)
-            else:
-                raise Exception("No preview")
-        except Exception as e:
-            # Placeholder if preview failed
-            placeholder = ctk.CTkLabel(
-                preview_frame,
-                text="🎬",
-                font=ctk.CTkFont(size=48)
-            )
-            placeholder.pack(expand=True)
+        # Placeholder until preview is ready
+        placeholder = ctk.CTkLabel(
+            preview_frame,
+            text="🎬",
+            font=self._placeholder_font_big
+        )
+        placeholder.pack(expand=True)
+        self.load_preview_async(preview_frame, placeholder, entry, self.PREVIEW_SIZE)  # Create preview
 
         # Filename
         name_label = ctk.CTkLabel(
             card,
             text=filename,
-            font=ctk.CTkFont(size=12),
+            font=self._name_font,
             wraplength=230
         )
         name_label.pack(pady=5)
@@ -215,39 +307,26 @@ class GalleryView(ctk.CTkFrame):
 
         return card
 
-    def create_video_row_list(self, filename):
+    def create_video_row_list(self, entry):
         """Create video row for list"""
         row = ctk.CTkFrame(self.videos_frame)
 
-        video_path = os.path.join(self.gallery_path, filename)
+        filename = entry.name  # Video filename
 
         # Mini preview
         preview_frame = ctk.CTkFrame(row, width=100, height=60, fg_color="gray20")
         preview_frame.pack(side="left", padx=10, pady=5)
         preview_frame.pack_propagate(False)
 
-        try:
-            prev = generate_video_prev(video_path, size=(100, 60))
-            if prev:
-                ctk_image = ctk.CTkImage(
-                    light_image=prev,
-                    dark_image=prev,
-                    size=prev.size
-                )
-                preview_label = ctk.CTkLabel(preview_frame, image=ctk_image, text="")  # Show image
-                preview_label.image = ctk_image
-                preview_label.pack(expand=True)
-            else:
-                raise Exception("No preview")
-        except Exception as e:
-            placeholder = ctk.CTkLabel(preview_frame, text="🎬", font=ctk.CTkFont(size=24))
-            placeholder.pack(expand=True)
+        placeholder = ctk.CTkLabel(preview_frame, text="🎬", font=self._placeholder_font_small)  # Until preview is ready
+        placeholder.pack(expand=True)
+        self.load_preview_async(preview_frame, placeholder, entry, (100, 60))  # Create preview
 
         # Name
         name_label = ctk.CTkLabel(
             row,
             text=filename,  # Video name
-            font=ctk.CTkFont(size=14),
+            font=self._name_font_list,
             anchor="w"  # Left align
         )
         name_label.pack(side="left", padx=10, fill="x", expand=True)
@@ -265,6 +344,89 @@ class GalleryView(ctk.CTkFrame):
 
         return row
 
+    def load_preview_async(self, preview_frame, placeholder, entry, size):
+        #Show cached preview or create it in background thread
+        try:
+            mtime = entry.stat().st_mtime  # Cached by scandir
+        except OSError:
+            return  # File removed, keep placeholder
+
+        key = (entry.name, size, mtime)  # Memory cache key
+        if key in self._img_cache:  # Already decoded in this session
+            self._img_cache.move_to_end(key)  # Mark as recently used
+            self._install_preview(preview_frame, placeholder, self._img_cache[key][1])
+            return
+
+        full_key = (entry.name, self.PREVIEW_SIZE, mtime)
+        if full_key in self._img_cache:  # Scale down instead of decoding again
+            full = self._img_cache[full_key][0]
+            self._on_preview_ready(preview_frame, placeholder, key, (full, self._scale_preview(full, size)))
+            return
+
+        future = THUMB_EXECUTOR.submit(self._get_thumbnail, entry.path, size, entry.stat())  # Decode off UI thread
+        self._thumb_futures.append(future)
+        future.add_done_callback(lambda f: self._schedule_preview(preview_frame, placeholder, key, f))
+
+    def _get_thumbnail(self, video_path, size, st):
+        #Decode full preview once and scale it to size (runs in worker thread)
+        full = get_cached_prev(video_path, self.PREVIEW_SIZE, st)
+        if not full:  # Preview failed
+            return None
+        return full, self._scale_preview(full, size)
+
+    def _scale_preview(self, full, size):
+        #Smaller copy of decoded preview
+        if size == self.PREVIEW_SIZE:  # Already right size
+            return full
+        prev = full.copy()
+        prev.thumbnail(size, PREVIEW_RESAMPLE)
+        return prev
+
+    def _schedule_preview(self, preview_frame, placeholder, key, future):
+        #Pass finished preview to UI thread (runs in worker thread)
+        if future.cancelled() or future.exception():  # No preview
+            return
+        try:
+            self.after(0, self._on_preview_ready, preview_frame, placeholder, key, future.result())
+        except (RuntimeError, tk.TclError):
+            pass  # View was closed
+
+    def _on_preview_ready(self, preview_frame, placeholder, key, result):
+        #Cache decoded previews and show the requested size
+        if not result:  # Preview failed, keep placeholder
+            return
+
+        full, prev = result
+        name, _, mtime = key
+        full_key = (name, self.PREVIEW_SIZE, mtime)
+        if full_key not in self._img_cache:  # Keep full size for the other view mode
+            self._cache_preview(full_key, full)
+        self._install_preview(preview_frame, placeholder, self._cache_preview(key, prev))
+
+    def _cache_preview(self, key, prev):
+        #Store preview in memory cache
+        if key in self._img_cache:  # Same image already cached
+            self._img_cache.move_to_end(key)
+            return self._img_cache[key][1]
+
+        ctk_image = ctk.CTkImage(
+            light_image=prev,  # Also used in dark mode
+            size=prev.size
+        )
+        self._img_cache[key] = (prev, ctk_image)  # Remember for next load
+        if len(self._img_cache) > self.IMG_CACHE_SIZE:  # Over limit
+            self._img_cache.popitem(last=False)  # Drop least recently used
+        return ctk_image
+
+    def _install_preview(self, preview_frame, placeholder, ctk_image):
+        #Replace placeholder with preview image
+        if not preview_frame.winfo_exists():  # Card destroyed
+            return
+
+        preview_label = ctk.CTkLabel(preview_frame, image=ctk_image, text="")  # Label and cache hold the image
+        placeholder.destroy()  # Remove icon
+        preview_label.pack(expand=True)
+
     def delete_video(self, filename):
         #Delete video from library
         video_path = os.path.join(self.gallery_path, filename)  # Full path
@@ -278,11 +440,37 @@ class GalleryView(ctk.CTkFrame):
         if dialog.get_input() == "yes":  # User confirmed
             try:
                 os.remove(video_path)  # Delete file
-                self.load_videos()  # Refresh display
+                for key in [k for k in self._img_cache if k[0] == filename]:  # Cached previews
+                    del self._img_cache[key]
+                self.remove_card(filename)  # Update display
             except Exception as e:
                 print(f"Delete error: {e}")  # Print error
 
+    def remove_card(self, filename):
+        #Remove one video from display
+        card = self._cards.pop(filename, None)  # Widget of deleted video
+        if card is None:  # Not shown, rebuild
+            self.load_videos()
+            return
+        card.destroy()
+
+        index = next(i for i, e in enumerate(self._video_files) if e.name == filename)  # Position
+        del self._video_files[index]
+        self._rendered -= 1  # Card was built
+
+        if not self._video_files:  # Library is empty now
+            self.load_videos()  # Show empty message
+        elif self.view_mode == "grid":  # Close the gap
+            for i, entry in enumerate(self._video_files[index:self._rendered], index):
+                self._cards[entry.name].grid(row=i // self.GRID_COLUMNS, column=i % self.GRID_COLUMNS)
+
+    def destroy(self):
+        #Drop queued previews with the view (workers are shared)
+        for future in self._thumb_futures:
+            future.cancel()
+        super().destroy()
+
     def toggle_view(self):
         """Toggle display mode"""
         self.view_mode = "list" if self.view_mode == "grid" else "grid"  # Switch mode
-        self.load_videos()  # Reload with new mode
\ No newline at end of file
+        self.load_videos()  # Full reload with new mode
\ No newline at end of file
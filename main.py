@@ -4,12 +4,8 @@
 # ============================================================
 
 import customtkinter as ctk
-from workouts_view import WorkoutsView
-from gallery_view import GalleryView
-from statistics_view import StatisticsView
-from settings_view import SettingsView
-from workout_editor import WorkoutEditor
 from models import DataManager
+# Views are imported when first shown to speed up startup
 
 
 class MainWindow(ctk.CTk):
@@ -18,6 +14,7 @@ class MainWindow(ctk.CTk):
     def __init__(self):
         super().__init__()
 
+        self.data_manager = DataManager.shared()  # One data manager for all windows
         self.title("Fitness Application")  # Window title
         self.geometry("1200x700")  # Window size
 
@@ -83,37 +80,42 @@ class MainWindow(ctk.CTk):
 
     def show_workouts_view(self):
         #Show workouts list
+        from workouts_view import WorkoutsView  # Loaded on first use
         self.clear_active_view()  # Remove old screen
         self.active_view = WorkoutsView(self)  # Create workouts screen
         self.active_view.grid(row=0, column=1, sticky="nsew", padx=20, pady=20)
 
     def show_gallery_view(self):
         #Show video gallery
+        from gallery_view import GalleryView  # Loaded on first use
         self.clear_active_view()  # Remove old screen
         self.active_view = GalleryView(self)  # Create gallery screen
         self.active_view.grid(row=0, column=1, sticky="nsew", padx=20, pady=20)
 
     def show_statistics_view(self):
         #Show statistics
+        from statistics_view import StatisticsView  # Loaded on first use
         self.clear_active_view()  # Remove old screen
         self.active_view = StatisticsView(self)  # Create stats screen
         self.active_view.grid(row=0, column=1, sticky="nsew", padx=20, pady=20)
 
     def show_settings_view(self):
         #Show settings
+        from settings_view import SettingsView  # Loaded on first use
         self.clear_active_view()  # Remove old screen
         self.active_view = SettingsView(self)  # Create settings screen
         self.active_view.grid(row=0, column=1, sticky="nsew", padx=20, pady=20)
 
     def create_new_workout(self):
         #Create new workout
-        editor = WorkoutEditor(self)  # Open editor window
+        from workout_editor import WorkoutEditor  # Loaded on first use
+        editor = WorkoutEditor(self, data_manager=self.data_manager)  # Open editor window
         editor.grab_set()
 
 
 def main():
     # Load saved theme from settings
-    data_manager = DataManager()  # Create data manager
+    data_manager = DataManager.shared()  # Shared data manager
     settings = data_manager.load_settings()  # Load settings
     saved_theme = settings.get("theme")  # Get theme setting
 
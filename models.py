@@ -5,9 +5,46 @@
 
 import json
 import os
-import sqlite3
+import pathlib
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+try:
+    import pysqlite3 as sqlite3  # Newer bundled SQLite (optional)
+except ImportError:
+    import sqlite3
+
+try:
+    import orjson  # Fast JSON (optional)
+except ImportError:
+    orjson = None
+
+
+def _read_json(path):
+    #Parse JSON file
+    if orjson:
+        with open(path, 'rb') as f:  # orjson works on bytes
+            return orjson.loads(f.read())
+    with open(path, 'r', encoding='utf-8') as f:  # Open file
+        return json.load(f)  # Parse JSON
+
+
+def _write_json(path, data):
+    #Write JSON file atomically (indented, UTF-8)
+    if orjson:
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    else:
+        payload = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+
+    tmp_path = path + '.tmp'  # Old file stays intact until replaced
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)  # Single write
+        f.flush()
+        os.fsync(f.fileno())  # On disk before rename
+    os.replace(tmp_path, path)  # Atomic swap
+
 
 # ==================== Exercise ====================
 class Exercise:
@@ -36,19 +73,43 @@ class Workout:
 
     def __init__(self, name="", exercises=None):
         self.name = name  # Workout name
+        self.display_name = name  # Set with list position by DataManager.load_workouts
+        self.exercises = exercises  # Padded to 10 cells by setter
+
+    @property
+    def exercises(self):
+        #Exercise cells (replace whole list or use set_exercise to keep totals right)
+        return self._exercises
+
+    @exercises.setter
+    def exercises(self, exercises):
         # Always 10 cells, some may be None
         if exercises is None:
-            self.exercises = [None] * 10  # Create 10 empty
+            self._exercises = [None] * 10  # Create 10 empty
         else:
-            self.exercises = exercises + [None] * (10 - len(exercises))  # Pad to 10
+            self._exercises = exercises + [None] * (10 - len(exercises))  # Pad to 10
+        # Totals kept up to date instead of summed on every call
+        self._total_duration = sum(ex.duration for ex in self._exercises if ex)
+        self._exercise_count = sum(1 for ex in self._exercises if ex)
+
+    def set_exercise(self, index, exercise):
+        #Put exercise (or None) into cell
+        old = self._exercises[index]
+        if old:  # Remove old totals
+            self._total_duration -= old.duration
+            self._exercise_count -= 1
+        if exercise:  # Add new totals
+            self._total_duration += exercise.duration
+            self._exercise_count += 1
+        self._exercises[index] = exercise
 
     def get_total_duration(self):
         #Total duration in seconds
-        return sum(ex.duration for ex in self.exercises if ex)  # Sum non-None exercises
+        return self._total_duration
 
     def get_exercise_count(self):
         #Number of non-empty exercises
-        return sum(1 for ex in self.exercises if ex)  # Count non-None
+        return self._exercise_count
 
     def to_dict(self):
         #Convert to dictionary
@@ -73,11 +134,25 @@ class Workout:
 class DataManager:
     #Application data management (JSON)
 
+    _shared = None  # Instance used by the whole application
+
     def __init__(self, workouts_file="data/workouts.json", settings_file="data/settings.json"):
         self.workouts_file = workouts_file  # Workouts JSON path
         self.settings_file = settings_file  # Settings JSON path
+        self._workouts_cache = None  # Parsed workout dicts
+        self._workouts_mtime = 0  # File mtime of cached data
+        self._settings_cache = None  # Parsed settings
+        self._settings_mtime = 0
+        self._writer = ThreadPoolExecutor(max_workers=1)  # Workout writes in order, off the UI thread
         self._ensure_files_exist()  # Create if missing
 
+    @classmethod
+    def shared(cls):
+        #Application-wide data manager (files checked once)
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
     def _ensure_files_exist(self):
         #Create files if they don't exist
         os.makedirs("data", exist_ok=True)  # Create data folder
@@ -89,236 +164,411 @@ class DataManager:
         if not os.path.exists(self.settings_file):  # No settings file
             self.save_settings({"theme": "dark", "gallery_path": "data/gallery"})  # Create defaults
 
+    def _workout_dicts(self):
+        #Cached workout dicts, re-read only if the file changed
+        mtime = os.stat(self.workouts_file).st_mtime_ns
+        if self._workouts_mtime is not None and mtime != self._workouts_mtime:  # Changed on disk, no write pending
+            data = _read_json(self.workouts_file)  # Parse JSON
+            workouts = data.get("workouts", []) if isinstance(data, dict) else []  # Other top level: no workouts
+            self._workouts_cache = workouts if isinstance(workouts, list) else []
+            self._workouts_mtime = mtime
+        return self._workouts_cache
+
     def load_workouts(self):
         #Load all workouts
         try:
-            with open(self.workouts_file, 'r', encoding='utf-8') as f:  # Open file
-                data = json.load(f)  # Parse JSON
-            return [Workout.from_dict(w) for w in data.get("workouts", [])]
-        except:
+            workouts = [Workout.from_dict(w) for w in self._workout_dicts()]  # Fresh objects for caller
+            for i, workout in enumerate(workouts):
+                workout.display_name = workout.name or f"Workout {i + 1}"  # Name shown in lists
+            return workouts
+        except (OSError, json.JSONDecodeError, KeyError, TypeError, AttributeError):  # Unreadable or malformed
             return []  # Return empty list
 
     def save_workouts(self, workouts):
         #Save all workouts
-        data = {"workouts": [w.to_dict() for w in workouts]}  # Convert to dicts
-        with open(self.workouts_file, 'w', encoding='utf-8') as f:  # Open file
-            json.dump(data, f, ensure_ascii=False, indent=2)  # Write JSON
+        self.save_workouts_async(workouts).result()  # Wait for the write
+
+    def save_workouts_async(self, workouts):
+        #Save all workouts in the background, returns a Future
+        return self._queue_workouts([w.to_dict() for w in workouts])  # Convert to dicts now, caller may change objects
+
+    def _editable_dicts(self):
+        #Copy of current workout dicts, unreadable file counts as empty (as in load_workouts)
+        try:
+            return list(self._workout_dicts())  # New list, cached one may be written right now
+        except (OSError, json.JSONDecodeError):
+            return []
+
+    def add_workout(self, workout):
+        #Append one workout (only it is converted), returns a Future
+        return self._queue_workouts(self._editable_dicts() + [workout.to_dict()])
+
+    def update_workout(self, index, workout):
+        #Replace workout at index, returns a Future
+        dicts = self._editable_dicts()
+        if 0 <= index < len(dicts):
+            dicts[index] = workout.to_dict()
+        else:  # File was unreadable or changed, keep the edit anyway
+            dicts.append(workout.to_dict())
+        return self._queue_workouts(dicts)
+
+    def delete_workout(self, index):
+        #Remove workout at index, returns a Future
+        dicts = self._editable_dicts()
+        if 0 <= index < len(dicts):
+            del dicts[index]
+        return self._queue_workouts(dicts)
+
+    def _queue_workouts(self, dicts):
+        #Make dicts the current workouts and write them in the background
+        self._workouts_cache = dicts  # Readers see new data at once
+        self._workouts_mtime = None  # Write pending, trust the cache
+        return self._writer.submit(self._write_workouts, {"workouts": dicts})
+
+    def _write_workouts(self, data):
+        #Write workouts JSON (writer thread), on failure the cache stays pending and the error goes to the Future
+        _write_json(self.workouts_file, data)  # Write JSON
+        mtime = os.stat(self.workouts_file).st_mtime_ns
+        if self._workouts_cache is data["workouts"]:  # No newer save queued
+            self._workouts_mtime = mtime
 
     def load_settings(self):
         #Load settings
         try:
-            with open(self.settings_file, 'r', encoding='utf-8') as f:  # Open file
-                return json.load(f)  # Parse JSON
-        except:
-            return {"theme": "dark", "gallery_path": "data/gallery"}  # Return defaults
+            if self._settings_mtime is not None:  # No write pending
+                mtime = os.stat(self.settings_file).st_mtime_ns
+                if mtime != self._settings_mtime:  # Changed on disk
+                    self._settings_cache = _read_json(self.settings_file)  # Parse JSON
+                    self._settings_mtime = mtime
+            if isinstance(self._settings_cache, dict):  # Not a JSON object otherwise
+                return dict(self._settings_cache)  # Copy, callers modify it
+        except (OSError, json.JSONDecodeError):
+            pass
+        return {"theme": "dark", "gallery_path": "data/gallery"}  # Return defaults
+
+    def update_settings(self, settings):
+        #Make settings current at once, the file is written later by save_settings
+        self._settings_cache = dict(settings)  # Readers see new settings at once
+        self._settings_mtime = None  # Write pending, trust the cache
 
     def save_settings(self, settings):
         """Save settings"""
-        with open(self.settings_file, 'w', encoding='utf-8') as f:  # Open file
-            json.dump(settings, f, ensure_ascii=False, indent=2)  # Write JSON
+        _write_json(self.settings_file, settings)  # Write JSON
+        self._settings_cache = dict(settings)  # No need to re-read
+        self._settings_mtime = os.stat(self.settings_file).st_mtime_ns
 
 
 # ==================== Database ====================
+# SQL text is kept in constants so the driver's statement cache reuses it
+
+SQL_CREATE_HISTORY = '''
+    CREATE TABLE IF NOT EXISTS workout_history
+    (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        workout_name TEXT NOT NULL,
+        start_time INTEGER NOT NULL,
+        duration_seconds INTEGER NOT NULL,
+        completed BOOLEAN NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+'''
+SQL_INDEX_START_TIME = 'CREATE INDEX IF NOT EXISTS idx_start_time ON workout_history(start_time)'
+SQL_INDEX_NAME_TIME = 'CREATE INDEX IF NOT EXISTS idx_name_time ON workout_history(workout_name, start_time DESC)'
+SQL_INDEX_NAME_SUMMARY = (  # Covers the per-workout aggregates
+    'CREATE INDEX IF NOT EXISTS idx_name_summary ON workout_history(workout_name, completed, duration_seconds)'
+)
+SQL_DROP_INDEX_NAME_COMPLETED = 'DROP INDEX IF EXISTS idx_name_completed'  # Prefix of idx_name_summary
+SQL_DROP_INDEX_WORKOUT_NAME = 'DROP INDEX IF EXISTS idx_workout_name'  # Covered by idx_name_time
+
+SQL_TEXT_START_TIMES = "SELECT id, start_time FROM workout_history WHERE typeof(start_time) = 'text'"
+SQL_SET_START_TIME = 'UPDATE workout_history SET start_time = ? WHERE id = ?'
+
+SQL_INSERT_SESSION = '''
+    INSERT INTO workout_history (workout_name, start_time, duration_seconds, completed)
+    VALUES (?, ?, ?, ?)
+'''
+SQL_UPDATE_SESSION = '''
+    UPDATE workout_history
+    SET duration_seconds = ?, completed = ?
+    WHERE id = ?
+'''
+SQL_DELETE_SESSION = 'DELETE FROM workout_history WHERE id = ?'
+
+SQL_WORKOUT_COUNTS = '''
+    SELECT workout_name,
+           COUNT(*) as count,
+           SUM(duration_seconds) as total_time,
+           ROUND(AVG(CASE WHEN completed = 1 THEN 100.0 ELSE 0.0 END), 1) as completion_rate
+    FROM workout_history
+    GROUP BY workout_name
+    ORDER BY count DESC
+'''
+
+SQL_DASHBOARD_STATS = '''
+    SELECT COUNT(*),
+           COALESCE(SUM(duration_seconds), 0),
+           COALESCE(SUM(completed = 1), 0),
+           COALESCE(SUM(completed = 0), 0),
+           (SELECT workout_name FROM workout_history ORDER BY start_time DESC LIMIT 1),
+           MAX(start_time),
+           strftime('%d.%m.%Y', MAX(start_time), 'unixepoch', 'localtime'),
+           CAST(100.0 * SUM(completed = 1) / NULLIF(COUNT(*), 0) AS INTEGER)
+    FROM workout_history
+'''
+
+SQL_WORKOUT_STATS = '''
+    SELECT COUNT(*),
+           COALESCE(SUM(duration_seconds), 0),
+           MAX(start_time),
+           COALESCE(SUM(completed = 1), 0),
+           COALESCE(SUM(completed = 0), 0),
+           COALESCE(CAST(AVG(CASE WHEN completed = 1 THEN duration_seconds END) AS INTEGER), 0),
+           strftime('%d.%m.%Y', MAX(start_time), 'unixepoch', 'localtime'),
+           strftime('%H:%M', MAX(start_time), 'unixepoch', 'localtime'),
+           CAST(100.0 * SUM(completed = 1) / NULLIF(COUNT(*), 0) AS INTEGER)
+    FROM workout_history
+    WHERE workout_name = ?
+'''
+
+SQL_WORKOUT_HISTORY = '''
+    SELECT id, start_time, duration_seconds, completed,
+           strftime('%d.%m.%Y', start_time, 'unixepoch', 'localtime') AS day,
+           strftime('%H:%M', start_time, 'unixepoch', 'localtime') AS time
+    FROM workout_history
+    WHERE workout_name = ?
+    ORDER BY start_time DESC
+    LIMIT ? OFFSET ?
+'''
+
+
+def _to_epoch(start_time):
+    #Unix seconds for datetime (local time) or number
+    if isinstance(start_time, datetime):
+        return int(start_time.timestamp())
+    return int(start_time)
+
+
+# All statistics page totals from one query
+DashboardStats = namedtuple(
+    "DashboardStats",
+    ["total_workouts", "total_time", "completed", "incomplete", "last_name", "last_date", "last_day",
+     "completed_pct"]
+)
+
+# Totals for one workout from one query
+WorkoutStats = namedtuple(
+    "WorkoutStats",
+    ["executions", "total_time", "last_date", "completed", "incomplete", "avg_duration", "last_day",
+     "last_time", "completed_pct"]
+)
+
+
 class Database:
     #Statistics database management (SQLite)
 
+    OPTIMIZE_INTERVAL = 15 * 60  # Seconds between PRAGMA optimize runs
+    SQL_TRACE = False  # Print every statement (check connection reuse while developing)
+
     def __init__(self, db_file="data/statistics.db"):
         self.db_file = db_file  # Database file path
         os.makedirs("data", exist_ok=True)  # Create folder
+        # One writer connection for the whole lifetime, autocommit mode
+        self.conn = self._connect(self.db_file)
+        self._lock = threading.Lock()  # Connection is shared between threads
+        self._configure(self.conn, writer=True)  # Connection settings
         self._create_tables()  # Create tables
 
-    def _create_tables(self):
-        #Create tables if they don't exist
-        conn = sqlite3.connect(self.db_file)  # Connect to database
+        # Separate read-only connection for statistics queries
+        if self.db_file == ":memory:":  # Other connection would see another database
+            self.ro_conn, self._ro_lock = self.conn, self._lock
+        else:
+            ro_uri = pathlib.Path(self.db_file).resolve().as_uri() + "?mode=ro"  # Path quoted (?, #, %)
+            self.ro_conn = self._connect(ro_uri, uri=True)
+            self._ro_lock = threading.Lock()
+            self._configure(self.ro_conn)
+        self._optimize_timer = None
+        self._schedule_optimize()  # Keep query plans fresh
+
+    def close(self):
+        #Close database connection
+        if self._optimize_timer:
+            self._optimize_timer.cancel()  # Stop periodic optimize
+        with self._lock:
+            try:
+                self.conn.execute("PRAGMA optimize")  # Refresh planner stats
+            except sqlite3.ProgrammingError:
+                pass  # Already closed
+            self.conn.close()
+        with self._ro_lock:
+            self.ro_conn.close()
+
+    def _schedule_optimize(self):
+        #Run PRAGMA optimize periodically in background
+        self._optimize_timer = threading.Timer(self.OPTIMIZE_INTERVAL, self._optimize)
+        self._optimize_timer.daemon = True  # Don't keep app alive
+        self._optimize_timer.start()
+
+    def _optimize(self):
+        #Refresh planner stats (runs in timer thread)
+        with self._lock:
+            try:
+                self.conn.execute("PRAGMA optimize")
+            except sqlite3.ProgrammingError:
+                return  # Closed meanwhile
+        self._schedule_optimize()  # Next run
+
+    @classmethod
+    def _connect(cls, database, uri=False):
+        #Open connection shared between threads
+        conn = sqlite3.connect(
+            database,
+            uri=uri,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=200  # Keep prepared statements
+        )
+        conn.row_factory = sqlite3.Row  # Rows readable by column name
+        if cls.SQL_TRACE:
+            conn.set_trace_callback(lambda sql: print(f"SQL [{database}]: {sql.strip()}"))
+        return conn
+
+    def _configure(self, conn, writer=False):
+        #Set connection PRAGMAs
         cursor = conn.cursor()  # Create cursor
+        if writer:  # Database-wide settings
+            if self.db_file != ":memory:":  # WAL needs a real file
+                cursor.execute("PRAGMA journal_mode=WAL")  # Readers don't wait for writers
+            cursor.execute("PRAGMA synchronous=NORMAL")  # Safe with WAL, fewer fsyncs
+        cursor.execute("PRAGMA busy_timeout=5000")  # Wait for locks instead of failing
+        cursor.execute("PRAGMA temp_store=MEMORY")  # Temp tables in RAM
+        cursor.execute("PRAGMA mmap_size=268435456")  # Read pages via mmap (256 MiB)
+        cursor.execute("PRAGMA cache_size=-20000")  # 20 MiB page cache
 
-        cursor.execute('''
-                       CREATE TABLE IF NOT EXISTS workout_history
-                       (
-                           id INTEGER PRIMARY KEY AUTOINCREMENT,
-                           workout_name TEXT NOT NULL,
-                           start_time TIMESTAMP NOT NULL,
-                           duration_seconds INTEGER NOT NULL,
-                           completed BOOLEAN NOT NULL,
-                           created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                       )
-                       ''')  # Create table
-
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_start_time ON workout_history(start_time)')  # Index for dates
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_workout_name ON workout_history(workout_name)')  # Index for names
-
-        conn.commit()  # Save
-        conn.close()
+    def _create_tables(self):
+        #Create tables if they don't exist
+        with self._lock:
+            cursor = self.conn.cursor()  # Create cursor
+            cursor.execute(SQL_CREATE_HISTORY)  # Create table
+            cursor.execute(SQL_INDEX_START_TIME)  # Index for dates
+            cursor.execute(SQL_INDEX_NAME_TIME)  # Index for per-workout history
+            cursor.execute(SQL_INDEX_NAME_SUMMARY)  # Index for per-workout totals
+            cursor.execute(SQL_DROP_INDEX_NAME_COMPLETED)  # Replaced by idx_name_summary
+            cursor.execute(SQL_DROP_INDEX_WORKOUT_NAME)  # Old name-only index
+        self._migrate_start_times()  # Old databases stored ISO text
+
+    def _migrate_start_times(self):
+        #Convert ISO text start times to unix seconds
+        with self._lock:
+            rows = self.conn.execute(SQL_TEXT_START_TIMES).fetchall()  # Rows still in old format
+            converted = []  # (epoch, id) pairs
+            for row_id, start_time in rows:
+                try:
+                    converted.append((_to_epoch(datetime.fromisoformat(start_time)), row_id))
+                except ValueError:
+                    print(f"Skipping unreadable start time {start_time!r} (row {row_id})")  # Left as text
+            if not converted:
+                return
+            with self.conn:  # One transaction
+                self.conn.execute("BEGIN IMMEDIATE")
+                self.conn.executemany(SQL_SET_START_TIME, converted)
 
     def add_workout_session(self, workout_name, start_time, duration, completed):
         #Add workout record
-        conn = sqlite3.connect(self.db_file)  # Connect
-        cursor = conn.cursor()  # Create cursor
-
-        cursor.execute('''
-                       INSERT INTO workout_history (workout_name, start_time, duration_seconds, completed)
-                       VALUES (?, ?, ?, ?)
-                       ''', (workout_name, start_time, duration, completed))  # Insert record
-
-        session_id = cursor.lastrowid  # Get new ID
-        conn.commit()  # Save
-        conn.close()
-        return session_id  # Return ID
+        with self._lock, self.conn:  # Commit, roll back on error
+            cursor = self.conn.cursor()  # Create cursor
+            cursor.execute("BEGIN IMMEDIATE")  # Take write lock up front
+            cursor.execute(SQL_INSERT_SESSION, (workout_name, _to_epoch(start_time), duration, completed))  # Insert record
+            session_id = cursor.lastrowid  # Get new ID
+            return session_id  # Return ID
+
+    def add_workout_sessions(self, rows):
+        #Add many workout records in one transaction
+        with self._lock, self.conn:  # Commit once, roll back on error
+            self.conn.execute("BEGIN IMMEDIATE")  # Take write lock up front
+            self.conn.executemany(  # rows: (name, start_time, duration, completed)
+                SQL_INSERT_SESSION,
+                [(name, _to_epoch(start_time), duration, completed) for name, start_time, duration, completed in rows]
+            )
 
     def update_workout_session(self, session_id, duration, completed):
         #Update workout record
-        conn = sqlite3.connect(self.db_file)  # Connect
-        cursor = conn.cursor()  # Create cursor
-
-        cursor.execute('''
-                       UPDATE workout_history
-                       SET duration_seconds = ?, completed = ?
-                       WHERE id = ?
-                       ''', (duration, completed, session_id))  # Update record
-
-        conn.commit()  # Save
-        conn.close()
+        with self._lock, self.conn:  # Commit, roll back on error
+            self.conn.execute("BEGIN IMMEDIATE")  # Take write lock up front
+            self.conn.execute(SQL_UPDATE_SESSION, (duration, completed, session_id))  # Update record
 
     def get_total_workouts(self):
         #Total number of workouts
-        conn = sqlite3.connect(self.db_file)  # Connect
-        cursor = conn.cursor()  # Create cursor
-        cursor.execute('SELECT COUNT(*) FROM workout_history')  # Count all
-        count = cursor.fetchone()[0]  # Get result
-        conn.close()
-        return count
+        return self.get_dashboard_stats().total_workouts
 
     def get_total_time(self):
         #Total workout time in seconds
-        conn = sqlite3.connect(self.db_file)  # Connect
-        cursor = conn.cursor()  # Create cursor
-        cursor.execute('SELECT SUM(duration_seconds) FROM workout_history')  # Sum durations
-        total = cursor.fetchone()[0] or 0  # Get result
-        conn.close()
-        return total
+        return self.get_dashboard_stats().total_time
 
     def get_last_workout(self):
         #Last workout (name, date)
-        conn = sqlite3.connect(self.db_file)  # Connect
-        cursor = conn.cursor()  # Create cursor
-        cursor.execute('''
-                       SELECT workout_name, start_time
-                       FROM workout_history
-                       ORDER BY start_time DESC LIMIT 1
-                       ''')  # Get latest
-        result = cursor.fetchone()  # Get result
-        conn.close()
-        return result if result else (None, None)
+        stats = self.get_dashboard_stats()
+        return stats.last_name, stats.last_date
 
     def get_completed_stats(self):
-        #Completed and incomplete workouts
-        conn = sqlite3.connect(self.db_file)  # Connect
-        cursor = conn.cursor()  # Create cursor
-        cursor.execute('''
-                       SELECT SUM(CASE WHEN completed = 1 THEN 1 ELSE 0 END) as completed,
-                              SUM(CASE WHEN completed = 0 THEN 1 ELSE 0 END) as incomplete
-                       FROM workout_history
-                       ''')  # Count both types
-        result = cursor.fetchone()  # Get result
-        conn.close()
-        return result if result else (0, 0)  # Return counts
+        #Completed and incomplete workouts, completed % (None without data)
+        stats = self.get_dashboard_stats()
+        return stats.completed, stats.incomplete, stats.completed_pct
 
     def get_workout_counts(self):
         #Execution count for each workout
-        conn = sqlite3.connect(self.db_file)  # Connect
-        cursor = conn.cursor()  # Create cursor
-        cursor.execute('''
-                       SELECT workout_name,
-                              COUNT(*) as count,
-                              SUM(duration_seconds) as total_time,
-                              ROUND(AVG(CASE WHEN completed = 1 THEN 100.0 ELSE 0.0 END), 1) as completion_rate
-                       FROM workout_history
-                       GROUP BY workout_name
-                       ORDER BY count DESC
-                       ''')  # Group by name
-        results = cursor.fetchall()  # Get all results
-        conn.close()
-        return results  # Return list
+        with self._ro_lock:
+            cursor = self.ro_conn.cursor()  # Create cursor
+            cursor.execute(SQL_WORKOUT_COUNTS)  # Group by name
+            results = cursor.fetchall()  # Get all results
+            return results  # Return list
+
+    def get_dashboard_stats(self):
+        #Totals, completion counts and last workout in one query
+        with self._ro_lock:
+            cursor = self.ro_conn.cursor()  # Create cursor
+            cursor.execute(SQL_DASHBOARD_STATS)  # Single table scan
+            return DashboardStats(*cursor.fetchone())
 
     def delete_session(self, session_id):
         #Delete record from history
-        conn = sqlite3.connect(self.db_file)  # Connect
-        cursor = conn.cursor()  # Create cursor
-        cursor.execute('DELETE FROM workout_history WHERE id = ?', (session_id,))  # Delete by ID
-        conn.commit()  # Save
-        conn.close()
+        with self._lock, self.conn:  # Commit, roll back on error
+            self.conn.execute("BEGIN IMMEDIATE")  # Take write lock up front
+            self.conn.execute(SQL_DELETE_SESSION, (session_id,))  # Delete by ID
 
     # ==================== INDIVIDUAL WORKOUT STATS ====================
 
+    def get_workout_stats(self, workout_name):
+        #All totals for specific workout in one query
+        with self._ro_lock:
+            cursor = self.ro_conn.cursor()  # Create cursor
+            cursor.execute(SQL_WORKOUT_STATS, (workout_name,))  # Single index range scan
+            return WorkoutStats(*cursor.fetchone())
+
     def get_workout_total_executions(self, workout_name):
         #Total executions for specific workout
-        conn = sqlite3.connect(self.db_file)  # Connect
-        cursor = conn.cursor()  # Create cursor
-        cursor.execute('SELECT COUNT(*) FROM workout_history WHERE workout_name = ?', (workout_name,))  # Count by name
-        count = cursor.fetchone()[0]  # Get result
-        conn.close()
-        return count
+        return self.get_workout_stats(workout_name).executions
 
     def get_workout_total_time(self, workout_name):
         #Total time for specific workout
-        conn = sqlite3.connect(self.db_file)  # Connect
-        cursor = conn.cursor()  # Create cursor
-        cursor.execute('SELECT SUM(duration_seconds) FROM workout_history WHERE workout_name = ?', (workout_name,))  # Sum by name
-        total = cursor.fetchone()[0] or 0  # Get result
-        conn.close()
-        return total
+        return self.get_workout_stats(workout_name).total_time
 
     def get_workout_last_execution(self, workout_name):
         #Last execution date for specific workout
-        conn = sqlite3.connect(self.db_file)  # Connect
-        cursor = conn.cursor()  # Create cursor
-        cursor.execute('''
-                       SELECT start_time
-                       FROM workout_history
-                       WHERE workout_name = ?
-                       ORDER BY start_time DESC LIMIT 1
-                       ''', (workout_name,))  # Get latest
-        result = cursor.fetchone()  # Get result
-        conn.close()
-        return result[0] if result else None  # Return date
+        return self.get_workout_stats(workout_name).last_date
 
     def get_workout_completed_stats(self, workout_name):
-        #Completed/incomplete for specific workout
-        conn = sqlite3.connect(self.db_file)  # Connect
-        cursor = conn.cursor()  # Create cursor
-        cursor.execute('''
-                       SELECT SUM(CASE WHEN completed = 1 THEN 1 ELSE 0 END) as completed,
-                              SUM(CASE WHEN completed = 0 THEN 1 ELSE 0 END) as incomplete
-                       FROM workout_history
-                       WHERE workout_name = ?
-                       ''', (workout_name,))  # Count by name
-        result = cursor.fetchone()  # Get result
-        conn.close()
-        return result if result else (0, 0)  # Return counts
-
-    def get_workout_history(self, workout_name):
-        #Get all sessions for specific workout
-        conn = sqlite3.connect(self.db_file)  # Connect
-        cursor = conn.cursor()  # Create cursor
-        cursor.execute('''
-                       SELECT id, start_time, duration_seconds, completed
-                       FROM workout_history
-                       WHERE workout_name = ?
-                       ORDER BY start_time DESC
-                       ''', (workout_name,))  # Get all sessions
-        results = cursor.fetchall()  # Get all results
-        conn.close()
-        return results  # Return list
+        #Completed/incomplete for specific workout, completed % (None without data)
+        stats = self.get_workout_stats(workout_name)
+        return stats.completed, stats.incomplete, stats.completed_pct
+
+    def get_workout_history(self, workout_name, limit=-1, offset=0):
+        #Get sessions for specific workout, newest first (limit -1 = all)
+        with self._ro_lock:
+            cursor = self.ro_conn.cursor()  # Create cursor
+            cursor.execute(SQL_WORKOUT_HISTORY, (workout_name, limit, offset))  # Get one page of sessions
+            results = cursor.fetchall()  # Get all results
+            return results  # Return list
 
     def get_workout_average_duration(self, workout_name):
         #Average duration for completed sessions
-        conn = sqlite3.connect(self.db_file)  # Connect
-        cursor = conn.cursor()  # Create cursor
-        cursor.execute('''
-                       SELECT AVG(duration_seconds)
-                       FROM workout_history
-                       WHERE workout_name = ? AND completed = 1
-                       ''', (workout_name,))
-        result = cursor.fetchone()[0]  # Get result
-        conn.close()
-        return int(result) if result else 0  # Return average
\ No newline at end of file
+        return self.get_workout_stats(workout_name).avg_duration
@@ -10,12 +10,15 @@ from models import DataManager
 class SettingsView(ctk.CTkFrame):
     #Application settings view
 
+    SAVE_DELAY = 250  # ms to wait for more changes before saving
+
     def __init__(self, master):
         super().__init__(master)
 
         self.master_window = master  # Reference to main
-        self.data_manager = DataManager()  # Data manager instance
+        self.data_manager = DataManager.shared()  # Shared data manager
         self.settings = self.data_manager.load_settings()  # Load current settings
+        self._save_after_id = None  # Scheduled settings write
 
         # Title
         label = ctk.CTkLabel(
@@ -114,9 +117,28 @@ class SettingsView(ctk.CTkFrame):
         # Toggle to opposite theme
         new_theme = "light" if current_theme == "dark" else "dark"  # Switch theme
 
-        # DEBUG: Show what's happening
-        print(f"Current: {current_theme}, Switching to: {new_theme}")  # Debug output
-
         # Save to settings
         self.settings["theme"] = new_theme  # Update settings
-        self.data_manager.save_settings(self.settings)  # Save to file
\ No newline at end of file
+        self.data_manager.update_settings(self.settings)  # Shared settings change at once
+        self.schedule_save()  # Save to file
+
+    def schedule_save(self):
+        #Save settings once rapid changes stop
+        if self._save_after_id:
+            self.after_cancel(self._save_after_id)  # Restart delay
+        self._save_after_id = self.after(self.SAVE_DELAY, self._save_settings)
+
+    def _save_settings(self):
+        #Debounced settings write
+        self._save_after_id = None
+        try:
+            self.data_manager.save_settings(self.settings)  # Write JSON
+        except OSError as e:
+            print(f"Settings save error: {e}")  # Cache keeps the change
+
+    def destroy(self):
+        #Write pending settings before the view closes
+        if self._save_after_id:
+            self.after_cancel(self._save_after_id)  # Write now instead
+            self._save_settings()
+        super().destroy()
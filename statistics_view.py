@@ -4,22 +4,36 @@
 # ============================================================
 
 import customtkinter as ctk
+import tkinter as tk
 from models import Database, DataManager
 from utils import format_duration
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from datetime import datetime
 
 
 class StatisticsView(ctk.CTkFrame):
     #Workout statistics view
 
+    HISTORY_ROWS = 20  # Sessions shown in history table
+    ROW_HEIGHT = 32  # Table row height in pixels
+    ROW_GAP = 4  # Space between table rows
+    RELOAD_DELAY = 80  # ms to wait for further selection changes
+
+    # matplotlib is slow to import, loaded with the first chart
+    _plt = None
+    _FigureCanvasTkAgg = None
+
     def __init__(self, master):
         super().__init__(master)
 
         self.db = Database()  # Database instance
-        self.data_manager = DataManager()  # Data manager instance
+        self.data_manager = DataManager.shared()  # Shared data manager
         self.selected_workout = "all"  # Current selection
+        self._pie_fig = None  # Pie chart figure, reused between redraws
+        self._pie_ax = None
+        self._pie_canvas = None
+        self._pie_data = None  # (completed, incomplete, title) waiting to be drawn
+        self._pie_after = None  # Scheduled draw
+        self._reload_after_id = None  # Scheduled selection reload
+        self._table_font = ctk.CTkFont(size=13)  # Table cell text
 
         # Title
         label = ctk.CTkLabel(
@@ -51,19 +65,21 @@ class StatisticsView(ctk.CTkFrame):
         )
         label.pack(side="left", padx=10)
 
-        # Get workouts list
-        workouts = self.data_manager.load_workouts()  # Load all workouts
-        workout_names = ["All Workouts"] + [w.name if w.name else f"Workout {i + 1}"
-                                            for i, w in enumerate(workouts)]  # Create names list
-
         self.selector = ctk.CTkOptionMenu(
             selector_frame,
-            values=workout_names,  # Dropdown options
+            values=["All Workouts"],  # Filled by refresh_workouts
             command=self.on_workout_selected,  # Selection handler
             width=300
         )
         self.selector.set("All Workouts")  # Default selection
         self.selector.pack(side="left", padx=10)
+        self.refresh_workouts()  # Dropdown options
+
+    def refresh_workouts(self):
+        #Reload workout names for dropdown
+        workouts = self.data_manager.load_workouts()  # Load all workouts
+        self._workout_names = [w.display_name for w in workouts]  # Create names list
+        self.selector.configure(values=["All Workouts"] + self._workout_names)  # Dropdown options
 
     def on_workout_selected(self, choice):
         #Workout selection handler
@@ -72,13 +88,25 @@ class StatisticsView(ctk.CTkFrame):
         else:
             self.selected_workout = choice  # Set specific workout
 
+        # Reload once selection settles
+        if self._reload_after_id:
+            self.after_cancel(self._reload_after_id)  # Drop earlier request
+        self._reload_after_id = self.after(self.RELOAD_DELAY, self._reload_selected)
+
+    def _reload_selected(self):
+        #Debounced reload after selection
+        self._reload_after_id = None
         self.load_statistics()  # Reload stats
 
     def load_statistics(self):
         #Load and display statistics
         # Clear
+        pie_widget = self._pie_canvas.get_tk_widget() if self._pie_canvas else None  # Kept for reuse
         for widget in self.stats_frame.winfo_children():  # Get all children
-            widget.destroy()  # Remove each
+            if widget is pie_widget:
+                widget.pack_forget()  # Hide until next chart
+            else:
+                widget.destroy()  # Remove each
 
         if self.selected_workout == "all":  # Show all
             self.show_general_statistics()  # General stats
@@ -87,36 +115,32 @@ class StatisticsView(ctk.CTkFrame):
 
     def show_general_statistics(self):
         #Show general statistics for all workouts
+        stats = self.db.get_dashboard_stats()  # All totals at once
+        if not stats.total_workouts:  # Empty database, nothing to chart
+            self.show_no_data("No workout data")
+            return
+
         # Metric cards
         cards_frame = ctk.CTkFrame(self.stats_frame)
         cards_frame.pack(fill="x", pady=10)
 
         # Total workouts
-        total_workouts = self.db.get_total_workouts()  # Get count
-        self.create_metric_card(cards_frame, "Total Workouts", str(total_workouts), 0, 0)
+        self.create_metric_card(cards_frame, "Total Workouts", str(stats.total_workouts), 0, 0)
 
         # Total time
-        total_seconds = self.db.get_total_time()  # Get total seconds
-        total_time_text = format_duration(total_seconds)  # Format time
+        total_time_text = format_duration(stats.total_time)  # Format time
         self.create_metric_card(cards_frame, "Total Time", total_time_text, 0, 1)
 
         # Last workout
-        last_name, last_date = self.db.get_last_workout()  # Get last workout
-        if last_name:  # If exists
-            date_obj = datetime.fromisoformat(last_date)  # Parse date
-            date_text = date_obj.strftime("%d.%m.%Y")  # Format date
-            last_text = f"{last_name}\n{date_text}"  # Combine name/date
+        if stats.last_name:  # If exists
+            last_text = f"{stats.last_name}\n{stats.last_day}"  # Combine name/date (formatted in SQL)
         else:
             last_text = "No data"  # No workouts
         self.create_metric_card(cards_frame, "Last Workout", last_text, 1, 0)
 
         # Completed/incomplete
-        completed, incomplete = self.db.get_completed_stats()  # Get counts
-        total = completed + incomplete  # Total workouts
-        if total > 0:  # Has data
-            completed_pct = int((completed / total) * 100)  # Calculate percentage
-            incomplete_pct = 100 - completed_pct  # Remaining percentage
-            completion_text = f"✓ {completed_pct}% / ✗ {incomplete_pct}%"
+        if stats.completed_pct is not None:  # Has data (percentage from SQL)
+            completion_text = f"✓ {stats.completed_pct}% / ✗ {100 - stats.completed_pct}%"
         else:
             completion_text = "No data"
         self.create_metric_card(cards_frame, "Completed", completion_text, 1, 1)
@@ -126,8 +150,8 @@ class StatisticsView(ctk.CTkFrame):
         graphs_frame.pack(fill="both", expand=True, pady=20)
 
         # Pie chart (completed/incomplete)
-        if total > 0:  # Has data
-            self.create_pie_chart(graphs_frame, completed, incomplete)
+        if stats.total_workouts:  # Has data
+            self.create_pie_chart(graphs_frame, stats.completed, stats.incomplete)
 
         # Workouts table
         self.create_workouts_table()  # Create table
@@ -135,36 +159,32 @@ class StatisticsView(ctk.CTkFrame):
     def show_individual_statistics(self):
         #Show statistics for specific workout
         workout_name = self.selected_workout  # Get workout name
+        stats = self.db.get_workout_stats(workout_name)  # All totals at once
+        if not stats.executions:  # Never executed, nothing to chart
+            self.show_no_data("No execution history")
+            return
 
         # Metric cards
         cards_frame = ctk.CTkFrame(self.stats_frame)
         cards_frame.pack(fill="x", pady=10)
 
         # Execution count
-        executions = self.db.get_workout_total_executions(workout_name)  # Get count
-        self.create_metric_card(cards_frame, "Executions", str(executions), 0, 0)
+        self.create_metric_card(cards_frame, "Executions", str(stats.executions), 0, 0)
 
         # Total time for this workout
-        total_seconds = self.db.get_workout_total_time(workout_name)  # Get time
-        total_time_text = format_duration(total_seconds)  # Format time
+        total_time_text = format_duration(stats.total_time)  # Format time
         self.create_metric_card(cards_frame, "Total Time", total_time_text, 0, 1)
 
         # Last execution
-        last_date = self.db.get_workout_last_execution(workout_name)  # Get date
-        if last_date:  # If exists
-            date_obj = datetime.fromisoformat(last_date)  # Parse date
-            last_text = date_obj.strftime("%d.%m.%Y\n%H:%M")  # Format date/time
+        if stats.last_date:  # If exists
+            last_text = f"{stats.last_day}\n{stats.last_time}"  # Date/time formatted in SQL
         else:
             last_text = "Never"  # Never executed
         self.create_metric_card(cards_frame, "Last Execution", last_text, 1, 0)
 
         # Completed / incomplete
-        completed, incomplete = self.db.get_workout_completed_stats(workout_name)  # Get stats
-        total = completed + incomplete  # Total count
-        if total > 0:
-            completed_pct = int((completed / total) * 100)  # Calculate percentage
-            incomplete_pct = 100 - completed_pct  # Remaining percentage
-            completion_text = f"✓ {completed_pct}% / ✗ {incomplete_pct}%"
+        if stats.completed_pct is not None:  # Has data (percentage from SQL)
+            completion_text = f"✓ {stats.completed_pct}% / ✗ {100 - stats.completed_pct}%"
         else:
             completion_text = "No data"  # No data
         self.create_metric_card(cards_frame, "Completed", completion_text, 1, 1)
@@ -174,8 +194,7 @@ class StatisticsView(ctk.CTkFrame):
         stats_frame2.pack(fill="x", pady=10)
 
         # Average duration
-        avg_duration = self.db.get_workout_average_duration(workout_name)
-        avg_text = format_duration(avg_duration) if avg_duration > 0 else "No data"
+        avg_text = format_duration(stats.avg_duration) if stats.avg_duration > 0 else "No data"
         self.create_metric_card(stats_frame2, "Avg Duration", avg_text, 0, 0)
 
         # Graphs
@@ -183,12 +202,21 @@ class StatisticsView(ctk.CTkFrame):
         graphs_frame.pack(fill="both", expand=True, pady=20)
 
         # Pie chart
-        if total > 0:
-            self.create_pie_chart(graphs_frame, completed, incomplete, title=f"Completion: {workout_name}")
+        if stats.executions:
+            self.create_pie_chart(graphs_frame, stats.completed, stats.incomplete, title=f"Completion: {workout_name}")
 
         # Execution history
         self.create_history_table(workout_name)  # Create history table
 
+    def show_no_data(self, text):
+        #Single message instead of empty cards and tables
+        no_data_label = ctk.CTkLabel(
+            self.stats_frame,
+            text=text,
+            font=ctk.CTkFont(size=14)
+        )
+        no_data_label.pack(pady=50)
+
     def create_metric_card(self, parent, title, value, row, col):
         #Create metric card
         card = ctk.CTkFrame(parent, fg_color="gray25")  # Card frame
@@ -215,10 +243,41 @@ class StatisticsView(ctk.CTkFrame):
         )
         value_label.pack(pady=(5, 20))
 
+    @classmethod
+    def _load_matplotlib(cls):
+        #Import matplotlib once, on first use
+        if cls._plt is None:
+            import matplotlib.pyplot as plt
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            cls._plt, cls._FigureCanvasTkAgg = plt, FigureCanvasTkAgg
+        return cls._plt, cls._FigureCanvasTkAgg
+
     def create_pie_chart(self, parent, completed, incomplete, title="Workout Completion"):
-        #Create pie chart
-        # Create figure
-        fig, ax = plt.subplots(figsize=(5, 4))  # Create plot
+        #Draw pie chart on the reused figure
+        if self._pie_canvas is None:  # First chart in this view
+            # Create figure
+            plt, FigureCanvasTkAgg = self._load_matplotlib()
+            self._pie_fig, self._pie_ax = plt.subplots(figsize=(5, 4))  # Create plot
+            self._pie_fig.patch.set_facecolor('#2b2b2b')  # Figure background
+            # Embed in tkinter, parented to stats_frame so it survives reloads
+            self._pie_canvas = FigureCanvasTkAgg(self._pie_fig, self.stats_frame)
+
+        pie_widget = self._pie_canvas.get_tk_widget()
+        pie_widget.pack(in_=parent, pady=20)  # Show inside graphs frame
+        pie_widget.lift(parent)  # Graphs frame is a newer sibling, stay above it
+
+        # Draw after the page is built, only the latest data if reloaded meanwhile
+        self._pie_data = (completed, incomplete, title)
+        if self._pie_after is None:
+            self._pie_after = self.after_idle(self._draw_pie)
+
+    def _draw_pie(self):
+        #Draw pending pie chart data
+        self._pie_after = None
+        completed, incomplete, title = self._pie_data
+
+        ax = self._pie_ax
+        ax.clear()  # Remove previous chart
 
         # Data
         sizes = [completed, incomplete]  # Data values
@@ -231,17 +290,13 @@ class StatisticsView(ctk.CTkFrame):
         ax.set_title(title, fontsize=14, pad=20)
 
         # Dark background
-        fig.patch.set_facecolor('#2b2b2b')  # Figure background
         ax.set_facecolor('#2b2b2b')  # Axes background
 
         # Text color
         for text in ax.texts:  # All text elements
             text.set_color('white')  # White text
 
-        # Embed in tkinter
-        canvas = FigureCanvasTkAgg(fig, parent)
-        canvas.draw()
-        canvas.get_tk_widget().pack(pady=20)
+        self._pie_canvas.draw_idle()  # Render when Tk is idle
 
     def create_workouts_table(self):
         #Create workouts table (for all workouts view)
@@ -284,35 +339,20 @@ class StatisticsView(ctk.CTkFrame):
             no_data_label.pack(pady=20)
             return
 
-        # Data rows
-        for workout_name, count, total_time, completion_rate in workout_stats:  # Each workout
-            row = ctk.CTkFrame(table_frame, fg_color="gray25")
-            row.pack(fill="x", padx=10, pady=2)
-
-            # Name (clickable)
-            name_btn = ctk.CTkButton(
-                row,
-                text=workout_name,  # Workout name
-                width=widths[0],
-                anchor="w",  # Left align
-                fg_color="transparent",
-                hover_color="gray35",
-                command=lambda wn=workout_name: self.show_workout_stats(wn)  # Click handler
-            )
-            name_btn.pack(side="left", padx=5, pady=5)
-
-            # Count
-            count_label = ctk.CTkLabel(row, text=str(count), width=widths[1])  # Execution count
-            count_label.pack(side="left", padx=5)
-
-            # Time
-            time_text = format_duration(total_time)  # Format duration
-            time_label = ctk.CTkLabel(row, text=time_text, width=widths[2])  # Time label
-            time_label.pack(side="left", padx=5)
-
-            # Percentage
-            pct_label = ctk.CTkLabel(row, text=f"{completion_rate}%", width=widths[3])  # Completion rate
-            pct_label.pack(side="left", padx=5)
+        # Data rows, drawn on one canvas
+        rows = [
+            [
+                (stat["workout_name"], None),  # Workout name
+                (str(stat["count"]), None),  # Execution count
+                (format_duration(stat["total_time"]), None),  # Format duration
+                (f"{stat['completion_rate']}%", None)  # Completion rate
+            ]
+            for stat in workout_stats
+        ]
+        self.draw_table(
+            table_frame, rows, widths, ["w", "center", "center", "center"],
+            on_click=lambda i: self.show_workout_stats(workout_stats[i]["workout_name"])  # Name click
+        )
 
     def create_history_table(self, workout_name):
         #Create execution history table (for individual workout)
@@ -344,7 +384,7 @@ class StatisticsView(ctk.CTkFrame):
             label.pack(side="left", padx=5, pady=5)
 
         # Data
-        history = self.db.get_workout_history(workout_name)  # Get history
+        history = self.db.get_workout_history(workout_name, limit=self.HISTORY_ROWS)  # Last sessions only
 
         if not history:  # No data
             no_data_label = ctk.CTkLabel(
@@ -355,54 +395,73 @@ class StatisticsView(ctk.CTkFrame):
             no_data_label.pack(pady=20)
             return  # Exit function
 
-        # Limit to last 20 sessions
-        for session_id, start_time, duration, completed in history:  # Each session
-            row = ctk.CTkFrame(table_frame, fg_color="gray25")
-            row.pack(fill="x", padx=10, pady=2)
-
-            # Parse date
-            date_obj = datetime.fromisoformat(start_time)  # Parse timestamp
-
-            # Date
-            date_label = ctk.CTkLabel(
-                row,
-                text=date_obj.strftime("%d.%m.%Y"),  # Format date
-                width=widths[0]
-            )
-            date_label.pack(side="left", padx=5, pady=5)
-
-            # Time
-            time_label = ctk.CTkLabel(
-                row,
-                text=date_obj.strftime("%H:%M"),  # Format time
-                width=widths[1]
-            )
-            time_label.pack(side="left", padx=5)
-
-            # Duration
-            duration_text = format_duration(duration)
-            duration_label = ctk.CTkLabel(row, text=duration_text, width=widths[2])
-            duration_label.pack(side="left", padx=5)
-
-            # Status
-            status_text = "✓ Completed" if completed else "✗ Incomplete"
-            status_color = "green" if completed else "red"
-            status_label = ctk.CTkLabel(
-                row,
-                text=status_text,
-                width=widths[3],
-                text_color=status_color  # Green or red
-            )
-            status_label.pack(side="left", padx=5)
+        rows = [
+            [
+                (session["day"], None),  # Formatted in SQL
+                (session["time"], None),
+                (format_duration(session["duration_seconds"]), None),
+                ("✓ Completed", "green") if session["completed"] else ("✗ Incomplete", "red")  # Status
+            ]
+            for session in history
+        ]
+        self.draw_table(table_frame, rows, widths, ["center"] * 4)
+
+    def draw_table(self, table_frame, rows, widths, anchors, on_click=None):
+        #Draw table rows as canvas items instead of widgets per cell
+        step = self.ROW_HEIGHT + self.ROW_GAP  # Row pitch
+        canvas = tk.Canvas(
+            table_frame,
+            height=len(rows) * step,
+            bg=table_frame._apply_appearance_mode(table_frame.cget("fg_color")),  # Blend with frame
+            highlightthickness=0
+        )
+        canvas.pack(fill="x", padx=10, pady=(0, 10))
+        text_color = table_frame._apply_appearance_mode(ctk.ThemeManager.theme["CTkLabel"]["text_color"])
+
+        for i, cells in enumerate(rows):  # Each row
+            top = i * step + self.ROW_GAP // 2
+            middle = top + self.ROW_HEIGHT // 2
+            canvas.create_rectangle(0, top, 0, top + self.ROW_HEIGHT, fill="gray25", width=0, tags="row_bg")
+
+            x = 5  # Same offsets as packed header labels
+            for (text, color), width, anchor in zip(cells, widths, anchors):
+                text_x = x + 5 if anchor == "w" else x + width // 2  # Left or centered
+                canvas.create_text(
+                    text_x, middle,
+                    text=text,
+                    anchor=anchor,
+                    fill=color or text_color,
+                    font=self._table_font
+                )
+                x += width + 10  # Column width + padding
+
+        canvas.bind("<Configure>", lambda e: self.stretch_rows(canvas, e.width))  # Follow canvas width
+
+        if on_click:  # Clickable rows
+            canvas.configure(cursor="hand2")
+            canvas.bind("<Button-1>", lambda e: on_click(int(e.y // step)) if e.y < len(rows) * step else None)
+        return canvas
+
+    def stretch_rows(self, canvas, width):
+        #Resize row backgrounds to canvas width
+        for item in canvas.find_withtag("row_bg"):
+            _, top, _, bottom = canvas.coords(item)
+            canvas.coords(item, 0, top, width, bottom)
 
     def show_workout_stats(self, workout_name):
         #Show specific workout statistics
-        # Find index in selector
-        workouts = self.data_manager.load_workouts()  # Load workouts
-        for i, w in enumerate(workouts):  # Each workout
-            name = w.name if w.name else f"Workout {i + 1}"  # Get name
-            if name == workout_name:  # Found match
-                self.selector.set(name)  # Set dropdown
-                self.selected_workout = name  # Update selection
-                self.load_statistics()  # Reload stats
-                break
\ No newline at end of file
+        if workout_name in self._workout_names:  # Workout still exists
+            self.selector.set(workout_name)  # Set dropdown
+            self.selected_workout = workout_name  # Update selection
+            self.load_statistics()  # Reload stats
+
+    def destroy(self):
+        #Close database and chart with the view
+        self.db.close()
+        if self._pie_after:
+            self.after_cancel(self._pie_after)  # Pending draw
+        if self._reload_after_id:
+            self.after_cancel(self._reload_after_id)  # Pending reload
+        if self._pie_fig:
+            self._plt.close(self._pie_fig)  # Release figure from pyplot
+        super().destroy()
@@ -3,15 +3,47 @@
 # Utility functions
 # ============================================================
 
-import cv2
+import functools
+import hashlib
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import PIL
 from PIL import Image
 
+try:
+    import av  # PyAV, reads container metadata without a decoder (optional)
+except ImportError:
+    av = None
+
+try:
+    import fcntl  # Reflink copies (Unix only)
+except ImportError:
+    fcntl = None
+
+THUMB_CACHE_DIR = "data/gallery/.thumbs"  # Preview cache folder
+THUMB_EXECUTOR = ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1))  # Preview decoding for all windows
+LIBRARY_FORMATS = frozenset({'.mp4', '.avi', '.mkv', '.mov'})  # Video extensions shown in the gallery
+NEXT_PREVIEW_SIZE = (400, 300)  # Player "Next Exercise" preview
+CELL_PREVIEW_SIZE = (80, 60)  # Editor cell and selection dialog preview
+FICLONE = 0x40049409  # Linux ioctl: share file blocks (Btrfs, XFS)
+
+# Pillow-SIMD (pip install pillow-simd) is versioned "X.Y.Z.postN" and makes Lanczos cheap
+PILLOW_SIMD = ".post" in PIL.__version__  # Drop-in Pillow replacement detected
+PREVIEW_RESAMPLE = Image.Resampling.LANCZOS if PILLOW_SIMD else Image.Resampling.BILINEAR  # Preview filter, cheapest on stock Pillow
+
 
 def format_duration(seconds):
     #Format seconds to readable format
-    hours = seconds // 3600  # Calculate hours
-    minutes = (seconds % 3600) // 60  # Calculate minutes
-    secs = seconds % 60  # Calculate seconds
+    return _format_duration(int(seconds))  # Whole seconds, hashable cache key
+
+
+@functools.lru_cache(maxsize=2048)
+def _format_duration(seconds):
+    #Cached formatting, tables repeat the same values
+    hours, rest = divmod(seconds, 3600)  # Hours and remaining seconds
+    minutes, secs = divmod(rest, 60)  # Minutes and seconds
 
     if hours > 0:  # Has hours
         return f"{hours}h {minutes}m"  # Show hours/minutes
@@ -23,45 +55,110 @@ def format_duration(seconds):
 
 def parse_time_input(time_str):
     #Parse 'mm:ss' string to seconds
+    parts = time_str.strip().split(':')  # Split by ":"
+    if len(parts) != 2:  # Invalid format
+        return 0
     try:
-        parts = time_str.strip().split(':')  # Split by ":"
-        if len(parts) == 2:  # Valid format
-            minutes = int(parts[0])  # Parse minutes
-            seconds = int(parts[1])  # Parse seconds
-            return minutes * 60 + seconds  # Convert to seconds
-        return 0  # Invalid format
-    except:
+        return int(parts[0]) * 60 + int(parts[1])  # int() allows spaces and signs, as before
+    except ValueError:
         return 0  # Parse error
 
 
+@functools.lru_cache(maxsize=4096)
 def seconds_to_mmss(seconds):
-    #Convert seconds to mm:ss format
-    minutes = seconds // 60  # Calculate minutes
-    secs = seconds % 60  # Remaining seconds
+    #Convert seconds to mm:ss format (cached, player timers call it every frame)
+    minutes, secs = divmod(seconds, 60)  # Minutes and remaining seconds
     return f"{minutes}:{secs:02d}"  # Format with padding
 
 
+def open_video_capture(video_path, decoder_threads=1):
+    #Open video with hardware decoding if available, single decoder thread by default (previews run in a thread pool)
+    import cv2  # Loaded on first use, list views only need the formatting helpers
+    params = []  # FFmpeg backend parameters
+    hw_accel = getattr(cv2, "CAP_PROP_HW_ACCELERATION", None)  # OpenCV 4.5.2+
+    if hw_accel is not None:
+        params += [hw_accel, cv2.VIDEO_ACCELERATION_ANY]  # GPU decoder if present, else software
+    n_threads = getattr(cv2, "CAP_PROP_N_THREADS", None)  # OpenCV 4.7+
+    if n_threads is not None and decoder_threads is not None:  # None keeps the backend default
+        params += [n_threads, decoder_threads]
+    if not params:  # Old OpenCV
+        cap = cv2.VideoCapture(video_path)
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Probes read one frame
+        return cap
+
+    try:
+        cap = cv2.VideoCapture(video_path, cv2.CAP_FFMPEG, params)  # FFmpeg backend
+    except cv2.error:
+        cap = None  # Parameters rejected
+    if cap is None or not cap.isOpened():  # Backend not available
+        if cap is not None:
+            cap.release()
+        cap = cv2.VideoCapture(video_path)  # Default backend
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Probes read one frame, ignored by backends without a buffer
+    return cap
+
+
 def generate_video_prev(video_path, size=(200, 150)):
-    #Create video preview
+    #Create video preview (first frame is a keyframe, no seek needed)
+    import cv2  # Loaded on first use
     try:
-        cap = cv2.VideoCapture(video_path)  # Open video
-        ret, frame = cap.read()  # Read first frame
+        cap = open_video_capture(video_path)  # Open video
+        ret = cap.grab()  # Demux first frame
+        if ret:
+            ret, frame = cap.retrieve()  # Convert only the frame we keep
         cap.release()  # Close video
 
         if ret:  # Frame read successfully
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            img = Image.fromarray(frame)
-            img.thumbnail(size)
-            return img
+            height, width = frame.shape[:2]  # Source size
+            scale = min(size[0] / width, size[1] / height)  # Fit inside preview box
+            if scale < 1:  # Shrink first, area filter in OpenCV
+                frame = cv2.resize(frame, (max(1, round(width * scale)), max(1, round(height * scale))),
+                                   interpolation=cv2.INTER_AREA)
+            height, width = frame.shape[:2]  # Preview size
+            return Image.frombuffer("RGB", (width, height), frame, "raw", "BGR", 0, 1)  # Swap channels while copying
         return None
-    except:
+    except (cv2.error, OSError, ValueError):  # Unreadable video
         return None
 
 
+def has_video_stream(video_path):
+    #Check container header for a video stream with a size (PyAV, no decoding)
+    if not av:
+        return False  # Caller must decode a frame
+    try:
+        with av.open(video_path) as container:  # Reads header only
+            stream = container.streams.video[0]  # First video stream
+            return bool(stream.codec_context.name) and stream.width * stream.height > 0
+    except (av.error.FFmpegError, IndexError):
+        return False  # No usable video stream
+
+
 def get_video_duration(video_path):
-    #Get video duration in seconds
+    #Get video duration in seconds (remembered until the file changes)
     try:
-        cap = cv2.VideoCapture(video_path)  # Open video
+        st = os.stat(video_path)  # File version
+    except OSError:
+        return 0  # Video missing
+    return _video_duration(os.path.abspath(video_path), st.st_mtime_ns, st.st_size)
+
+
+@functools.lru_cache(maxsize=256)
+def _video_duration(video_path, mtime_ns, file_size):
+    #Probe duration, mtime/size only make the cache key
+    if av:
+        try:
+            with av.open(video_path) as container:  # Reads header only
+                if container.duration:  # Container duration in microseconds
+                    return int(container.duration / av.time_base)
+                stream = container.streams.video[0]  # Fall back to stream duration
+                if stream.duration:
+                    return int(stream.duration * stream.time_base)
+        except (av.error.FFmpegError, IndexError):
+            pass  # Not readable by PyAV, try OpenCV
+
+    import cv2  # Loaded on first use
+    try:
+        cap = open_video_capture(video_path)  # Open video
         fps = cap.get(cv2.CAP_PROP_FPS)  # Get frames per second
         frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT)  # Get total frames
         cap.release()  # Close video
@@ -69,5 +166,204 @@ def get_video_duration(video_path):
         if fps > 0:  # Valid FPS
             return int(frame_count / fps)  # Calculate duration
         return 0  # Invalid FPS
-    except:
-        return 0  # Error occurred
\ No newline at end of file
+    except (cv2.error, OSError, ValueError):
+        return 0  # Error occurred
+
+
+def _thumb_cache_path(video_path, size, st=None):
+    #Cache file for video preview (changes with file mtime and size)
+    abs_path = os.path.abspath(video_path)  # Absolute path
+    if st is None:  # Not known by caller
+        st = os.stat(video_path)  # File version
+    key = hashlib.blake2b(f"{abs_path}|{st.st_mtime_ns}|{st.st_size}|{size}".encode(),
+                          digest_size=16).hexdigest()  # Cache key
+    return os.path.join(THUMB_CACHE_DIR, f"{key}.jpg")
+
+
+def _save_prev(img, thumb_path):
+    #Save preview under a temp name and swap it in, readers never see a partial file
+    tmp_path = f"{thumb_path}.{os.getpid()}.{threading.get_ident()}.tmp"  # Unique per worker thread
+    try:
+        img.save(tmp_path, "JPEG", quality=82)
+        os.replace(tmp_path, thumb_path)  # Atomic, last writer wins
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def prune_preview_cache(video_paths, sizes):
+    #Delete cached previews of videos that are gone or changed (runs in background)
+    keep = set()  # Cache files still in use
+    for video_path in video_paths:
+        try:
+            st = os.stat(video_path)  # File version
+        except OSError:
+            continue  # Video gone, its previews go too
+        keep.update(os.path.basename(_thumb_cache_path(video_path, size, st)) for size in sizes)
+    try:
+        with os.scandir(THUMB_CACHE_DIR) as it:
+            stale = [e.path for e in it if e.name.endswith(".jpg") and e.name not in keep]
+    except OSError:
+        return  # No cache yet
+    for path in stale:
+        try:
+            os.remove(path)
+        except OSError:
+            pass  # Removed meanwhile
+
+
+def get_cached_prev(video_path, size=(200, 150), st=None):
+    #Get video preview from disk cache, create on miss
+    try:
+        thumb_path = _thumb_cache_path(video_path, size, st)  # Cache file path
+    except OSError:
+        return None  # Video missing
+
+    if os.path.exists(thumb_path):  # Cache hit
+        try:
+            img = Image.open(thumb_path)  # Open cached preview
+            img.thumbnail(size, PREVIEW_RESAMPLE)  # In place, uses JPEG draft mode if larger
+            img.load()  # Read pixels, close file
+            return img
+        except OSError:
+            pass  # Broken cache file, create again
+
+    prev = generate_video_prev(video_path, size)  # Decode video frame
+    if prev:  # Save only on miss
+        try:
+            os.makedirs(THUMB_CACHE_DIR, exist_ok=True)  # Create cache folder
+            _save_prev(prev, thumb_path)  # Save preview
+        except OSError:
+            pass  # Cache is optional
+    return prev
+
+
+def warm_preview_cache(video_path, sizes):
+    #Save previews of several sizes to disk cache from one decoded frame (run after import)
+    try:
+        st = os.stat(video_path)  # File version
+    except OSError:
+        return  # Video missing
+    missing = [(size, _thumb_cache_path(video_path, size, st)) for size in sizes]
+    missing = [(size, path) for size, path in missing if not os.path.exists(path)]
+    if not missing:  # All cached
+        return
+
+    largest = max((size for size, _ in missing), key=lambda s: s[0] * s[1])  # Decode once, at the largest size
+    prev = generate_video_prev(video_path, largest)
+    if not prev:  # Unreadable video
+        return
+    try:
+        os.makedirs(THUMB_CACHE_DIR, exist_ok=True)  # Create cache folder
+        for size, thumb_path in missing:
+            img = prev
+            if size != largest:  # Scale down from decoded frame
+                img = prev.copy()
+                img.thumbnail(size, PREVIEW_RESAMPLE)
+            _save_prev(img, thumb_path)  # Save preview
+    except OSError:
+        pass  # Cache is optional
+
+
+def video_fingerprint(video_path, chunk=1024 * 1024):
+    #Fast content hash: size + first and last MB
+    size = os.path.getsize(video_path)  # File size
+    digest = hashlib.blake2b(str(size).encode(), digest_size=16)
+    with open(video_path, 'rb') as f:
+        digest.update(f.read(chunk))  # Head
+        if size > chunk:
+            f.seek(max(chunk, size - chunk))  # Tail, no overlap with head
+            digest.update(f.read(chunk))
+    return digest.hexdigest()
+
+
+def find_gallery_duplicate(src, gallery_path):
+    #Name of gallery file with the same content as src, or None
+    size = os.path.getsize(src)  # Only files of equal size can match
+    with os.scandir(gallery_path) as it:
+        candidates = [e.path for e in it if e.is_file() and e.stat().st_size == size]
+    if not candidates:  # Usual case, nothing to hash
+        return None
+    fingerprint = video_fingerprint(src)
+    for path in candidates:
+        if video_fingerprint(path) == fingerprint:
+            return os.path.basename(path)
+    return None
+
+
+def unique_filename(filename, existing):
+    #Filename not in existing names, adds _1, _2, ... before the extension
+    if filename not in existing:
+        return filename
+    name, ext = os.path.splitext(filename)  # Split name/extension
+    counter = 1
+    while f"{name}_{counter}{ext}" in existing:  # Set lookups, no stat calls
+        counter += 1
+    return f"{name}_{counter}{ext}"
+
+
+def _reflink(fsrc, fdst):
+    #Clone file blocks instead of copying, True if the filesystem did it
+    if not fcntl:
+        return False
+    try:
+        fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())  # Copy-on-write, near instant
+        return True
+    except OSError:
+        return False  # Other filesystem or not Linux
+
+
+def copy_video_file(src, dst):
+    #Copy video file by reflink or in kernel (copy_file_range) where possible
+    # Copy to a hidden temp name, gallery scans never see a partial file
+    tmp_path = os.path.join(os.path.dirname(dst), f".{os.path.basename(dst)}.part")
+    try:
+        with open(src, 'rb') as fsrc, open(tmp_path, 'wb') as fdst:
+            if not _reflink(fsrc, fdst):  # Blocks not shared, copy data
+                _copy_file_data(fsrc, fdst)
+        shutil.copystat(src, tmp_path)  # Keep modification time
+        os.replace(tmp_path, dst)  # Appears complete
+    except OSError:
+        try:
+            os.remove(tmp_path)  # No truncated leftovers
+        except OSError:
+            pass
+        raise
+
+
+def _copy_file_data(fsrc, fdst):
+    #Copy open file contents, kernel copy first
+    copied = 0  # Bytes copied in kernel
+    if hasattr(os, "copy_file_range"):  # Linux
+        size = os.fstat(fsrc.fileno()).st_size  # Source size
+        try:
+            while copied < size:
+                sent = os.copy_file_range(fsrc.fileno(), fdst.fileno(), size - copied)
+                if sent == 0:  # End of file
+                    break
+                copied += sent
+        except OSError:
+            pass  # Not supported here, copy the rest below
+
+    fsrc.seek(copied)  # Continue after kernel copy
+    fdst.seek(copied)
+    shutil.copyfileobj(fsrc, fdst, length=4 * 1024 * 1024)  # 4 MB buffer
+
+
+def get_memo_prev(video_path, size=(200, 150), st=None):
+    #Get video preview from memory, disk cache or video (remembered until the file changes)
+    if st is None:  # Not known by caller
+        try:
+            st = os.stat(video_path)  # File version
+        except OSError:
+            return None  # Video missing
+    return _memo_prev(os.path.abspath(video_path), size, st.st_mtime_ns, st.st_size)
+
+
+@functools.lru_cache(maxsize=256)
+def _memo_prev(video_path, size, mtime_ns, file_size):
+    #Shared image, callers must not modify it
+    return get_cached_prev(video_path, size)
@@ -4,24 +4,64 @@
 # ============================================================
 
 import customtkinter as ctk
-from tkinter import filedialog, messagebox
+import tkinter as tk
+from tkinter import filedialog, messagebox, TclError
+import functools
 import os
+import stat
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from models import DataManager, Workout, Exercise
-from utils import parse_time_input, seconds_to_mmss, generate_video_prev
+from utils import (parse_time_input, seconds_to_mmss, get_memo_prev, open_video_capture, has_video_stream,
+                   copy_video_file, find_gallery_duplicate, warm_preview_cache, unique_filename, LIBRARY_FORMATS,
+                   NEXT_PREVIEW_SIZE, CELL_PREVIEW_SIZE, THUMB_EXECUTOR)
 from PIL import Image, ImageTk
 import cv2
-from pathlib import Path
 
 
 # ==================== VALIDATION FUNCTIONS ====================
 
-def validate_video_path(video_path):
-    # Validate video file path.
+# Video limits
+SUPPORTED_FORMATS = frozenset({'.mp4', '.avi', '.mkv', '.mov', '.wmv', '.flv', '.webm'})  # Allowed extensions
+MAX_FILE_SIZE = 500 * 1024 * 1024  # 500 MB limit
+MIN_FILE_SIZE = 1024  # 1 KB minimum
 
-    # Supported formats
-    SUPPORTED_FORMATS = ['.mp4', '.avi', '.mkv', '.mov', '.wmv', '.flv', '.webm']  # Allowed extensions
-    MAX_FILE_SIZE = 500 * 1024 * 1024  # 500 MB limit
-    MIN_FILE_SIZE = 1024  # 1 KB minimum
+MAX_CELLS = 10  # Exercises per workout
+PREVIEW_BOX = CELL_PREVIEW_SIZE  # Cell and dialog preview size
+PREVIEW_BG = "#333333"  # gray20, preview frame colour
+
+# Duration limits
+MIN_DURATION = 10  # 10 seconds minimum
+MAX_DURATION = 3600  # 1 hour maximum
+RECOMMENDED_MIN = 30  # 30 seconds recommended
+RECOMMENDED_MAX = 600  # 10 minutes recommended
+
+# Container signatures: (offset, bytes)
+VIDEO_MAGIC = (
+    (4, b'ftyp'), (4, b'moov'), (4, b'mdat'), (4, b'wide'), (4, b'free'),  # MP4 / MOV atoms
+    (8, b'AVI '),  # AVI (RIFF)
+    (0, b'\x1a\x45\xdf\xa3'),  # MKV / WebM (EBML)
+    (0, b'\x30\x26\xb2\x75\x8e\x66\xcf\x11'),  # WMV (ASF)
+    (0, b'FLV'),  # FLV
+)
+
+_VALIDATED = {}  # path -> (mtime_ns, size) of videos that decoded fine
+_VALIDATE_EXECUTOR = ThreadPoolExecutor(max_workers=min(10, os.cpu_count() or 1))  # Video probes, shared by every save
+
+
+
+def has_video_header(video_path):
+    # Check container signature in the first bytes (no decoding).
+    try:
+        with open(video_path, 'rb') as f:
+            head = f.read(12)  # Enough for all signatures
+    except OSError:  # Cannot read
+        return False
+    return any(head[offset:offset + len(magic)] == magic for offset, magic in VIDEO_MAGIC)
+
+
+def validate_video_path(video_path, decode=True):
+    # Validate video file path (decode=False only checks the file header).
 
     # Check if path is provided
     if not video_path:  # Empty path
@@ -31,24 +71,23 @@ def validate_video_path(video_path):
     if not isinstance(video_path, str):  # Type check
         return False, f"Video path must be string, got {type(video_path)}"
 
-    # Convert to Path object
-    path = Path(video_path)  # Pathlib object
-
-    # Check if file exists
-    if not path.exists():  # File missing
+    # Single stat call for existence, type, size and modification time
+    try:
+        file_stat = os.stat(video_path)  # File metadata
+    except OSError:  # File missing
         return False, f"Video file does not exist: {video_path}"
 
     # Check if it's a file (not directory)
-    if not path.is_file():  # Is directory
+    if not stat.S_ISREG(file_stat.st_mode):  # Is directory
         return False, f"Path is not a file: {video_path}"
 
     # Check file extension
-    file_extension = path.suffix.lower()  # Get extension
+    file_extension = os.path.splitext(video_path)[1].lower()  # Get extension
     if file_extension not in SUPPORTED_FORMATS:  # Invalid format
         return False, f"Unsupported video format: {file_extension}"
 
     # Check file size
-    file_size = path.stat().st_size  # Get size
+    file_size = file_stat.st_size  # Get size
 
     if file_size < MIN_FILE_SIZE:  # Too small
         return False, f"Video file too small ({file_size} bytes)"
@@ -61,35 +100,53 @@ def validate_video_path(video_path):
     if not os.access(video_path, os.R_OK):  # No read permission
         return False, f"Video file is not readable"
 
+    # Already decoded this version of the file
+    key = (file_stat.st_mtime_ns, file_size)  # File version
+    if _VALIDATED.get(video_path) == key:
+        return True, None  # Valid video
+
+    # Cheap check, full decode happens on save
+    if not decode:
+        if not has_video_header(video_path):  # Unknown signature
+            return False, "File is not a recognized video container"
+        return True, None  # Looks like a video
+
+    # Healthy container header is enough, no frame decode
+    if has_video_stream(video_path):
+        _VALIDATED[video_path] = key  # Skip probing next time
+        return True, None  # Valid video
+
     # Try to open with OpenCV
     try:
-        cap = cv2.VideoCapture(video_path)  # Open video
+        cap = open_video_capture(video_path)  # Open video
         if not cap.isOpened():  # Failed to open
             cap.release()  # Close video
             return False, "Cannot open video file (corrupted or invalid format)"
 
-        # Try to read first frame
-        ret, frame = cap.read()  # Read frame
+        # Stream properties from the header are enough
+        frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT)  # Frames reported by container
+        width = cap.get(cv2.CAP_PROP_FRAME_WIDTH)  # Frame width
+        if frame_count > 0 and width > 0:
+            ret = True  # Valid stream, no decode
+        else:  # Container without frame count, try to grab first frame
+            ret = cap.grab()  # Grab frame
         cap.release()  # Close video
 
         if not ret:  # No frame
             return False, "Cannot read video frames (file may be corrupted)"
 
-    except Exception as e:  # Any error
+    except (cv2.error, OSError, ValueError) as e:  # Unreadable video
         return False, f"Error validating video: {str(e)}"
 
     # All checks passed
+    _VALIDATED[video_path] = key  # Skip decoding next time
     return True, None  # Valid video
 
 
+@functools.lru_cache(maxsize=4096)
 def validate_duration(duration):
     # Validate exercise duration.
 
-    MIN_DURATION = 10  # 10 seconds minimum
-    MAX_DURATION = 3600  # 1 hour maximum
-    RECOMMENDED_MIN = 30  # 30 seconds recommended
-    RECOMMENDED_MAX = 600  # 10 minutes recommended
-
     # Check if duration is provided
     if duration is None:  # No value
         return False, "Duration is required", None
@@ -130,8 +187,9 @@ def validate_duration(duration):
     return True, None, warning  # Valid with warning
 
 
-def validate_workout(workout):
-    # Validate entire workout.
+def validate_workout(workout, video_results=None):
+    # Validate entire workout (video probes only for slots whose duration passes).
+    # video_results: {slot: (is_valid, error)} the caller already has, other slots are probed in parallel
 
     errors = []  # Error list
     warnings = []  # Warning list
@@ -141,31 +199,37 @@ def validate_workout(workout):
         warnings.append("Workout has no name (will be displayed as 'Untitled')")
 
     # Check if workout has any exercises
-    exercise_count = sum(1 for ex in workout.exercises if ex is not None)  # Count non-None
+    tasks = [(i, ex) for i, ex in enumerate(workout.exercises) if ex is not None]  # Filled slots
 
-    if exercise_count == 0:  # No exercises
+    if not tasks:  # No exercises
         errors.append("Workout has no exercises")
         return False, errors, warnings  # Return immediately
 
-    # Validate each exercise
-    for i, exercise in enumerate(workout.exercises):  # Loop through
-        if exercise is None:  # Empty slot
-            continue  # Skip
+    # Check durations first (cheap), videos only for slots that pass
+    durations = {i: validate_duration(ex.duration) for i, ex in tasks}  # (is_valid, error, warning)
 
-        # Validate video path
-        is_valid, error = validate_video_path(exercise.video_path)  # Check video
-        if not is_valid:  # Invalid
-            errors.append(f"Exercise {i + 1}: {error}")  # Add error
+    # Probe remaining videos together (PyAV/OpenCV release the GIL while reading)
+    video_results = dict(video_results or {})
+    probe = [(i, ex.video_path) for i, ex in tasks if durations[i][0] and i not in video_results]
+    video_results.update(zip([i for i, _ in probe], _VALIDATE_EXECUTOR.map(validate_video_path, [p for _, p in probe])))
 
-        # Validate duration
-        is_valid, error, warning = validate_duration(exercise.duration)  # Check duration
+    # Collect results in exercise order
+    for i, exercise in tasks:  # Loop through
+        # Video path result
+        if i in video_results:
+            is_valid, error = video_results[i]
+            if not is_valid:  # Invalid
+                errors.append(f"Exercise {i + 1}: {error}")  # Add error
+
+        # Duration result
+        is_valid, error, warning = durations[i]
         if not is_valid:  # Invalid
             errors.append(f"Exercise {i + 1}: {error}")  # Add error
         elif warning:  # Has warning
             warnings.append(f"Exercise {i + 1}: {warning}")  # Add warning
 
     # Check total workout duration
-    total_duration = workout.get_total_duration()  # Get total time
+    total_duration = workout.get_total_duration()  # Kept up to date by Workout
 
     if total_duration < 60:  # Very short
         warnings.append(f"Workout is very short (total: {total_duration}s)")
@@ -179,19 +243,72 @@ def validate_workout(workout):
     return is_valid, errors, warnings  # Return result
 
 
+# ==================== PREVIEW LOADING ====================
+
+def load_preview_async(owner, label, video_path, st=None):
+    # Show 80x60 preview in label once decoded in a worker thread
+    label.preview_path = video_path  # Newest request wins
+    future = THUMB_EXECUTOR.submit(get_memo_prev, video_path, PREVIEW_BOX, st)
+    future.add_done_callback(lambda f: _schedule_preview(owner, label, video_path, f))
+    return future
+
+
+def _schedule_preview(owner, label, video_path, future):
+    # Pass finished preview to Tk thread (runs in worker thread)
+    if future.cancelled() or future.exception() or not future.result():  # No preview, keep icon
+        return
+    try:
+        owner.after(0, _install_preview, label, video_path, future.result())
+    except (RuntimeError, TclError):
+        pass  # Window was closed
+
+
+def _install_preview(label, video_path, prev):
+    # Replace icon with preview image
+    if not label.winfo_exists() or label.preview_path != video_path:  # Closed or video changed
+        return
+    box = Image.new("RGB", PREVIEW_BOX, PREVIEW_BG)  # Fixed size, so the Tk image can be reused
+    box.paste(prev, ((PREVIEW_BOX[0] - prev.width) // 2, (PREVIEW_BOX[1] - prev.height) // 2))
+    photo = getattr(label, "image", None)  # Tk image from earlier preview
+    if photo is None:
+        photo = ImageTk.PhotoImage(box)  # Convert to Tkinter
+        label.image = photo  # Keep reference
+    else:
+        photo.paste(box)  # Update pixels in place
+    label.configure(image=photo, text="")  # Show image
+
+
+def _mode_color(color):
+    # Pick the light or dark entry of a CTk colour for the current appearance mode
+    if isinstance(color, (list, tuple)):  # (light, dark) pair
+        return color[1] if ctk.get_appearance_mode() == "Dark" else color[0]
+    return color
+
+
 # ==================== WORKOUT EDITOR CLASS ====================
 
 class WorkoutEditor(ctk.CTkToplevel):
     # Workout editing window
 
-    def __init__(self, master, workout=None, workout_index=None):
+    VALIDATE_DELAY = 150  # ms to wait for more time-field events
+
+    def __init__(self, master, workout=None, workout_index=None, data_manager=None):
         super().__init__(master)  # Initialize parent
 
         self.master_window = master  # Reference to main
-        self.data_manager = DataManager()  # Data manager instance
+        self.data_manager = data_manager or DataManager.shared()  # Caller's data manager
         self.workout = workout if workout else Workout()  # Existing or new
         self.workout_index = workout_index  # Index for editing
         self.gallery_path = "data/gallery"  # Video folder path
+        self._gallery_prefix = os.path.join(self.gallery_path, "")  # Folder with separator, for building paths
+        self._pending_cells = set()  # Cells waiting for duration validation
+        self._validate_after_id = None  # Scheduled validation
+
+        # Fonts shared by all cells
+        self._number_font = ctk.CTkFont(size=16, weight="bold")  # Cell number
+        self._icon_font = ctk.CTkFont(size=24)  # Preview placeholder
+        self._name_font = ctk.CTkFont(size=12)  # Video name
+        self._status_font = ctk.CTkFont(size=16)  # Status mark and clock icon
 
         # Window setup
         self.title("Workout Editor")  # Window title
@@ -244,12 +361,16 @@ class WorkoutEditor(ctk.CTkToplevel):
         self.cells_frame = ctk.CTkScrollableFrame(self, height=400)  # Scrollable container
         self.cells_frame.pack(fill="both", expand=True, padx=20, pady=(0, 20))
 
-        # Create 10 cells
+        # Add cell button, cells are created on demand (up to 10)
         self.cells = []  # Empty list
-        for i in range(10):  # Loop 10 times
-            cell = self.create_exercise_cell(i)  # Create cell widget
-            cell.pack(fill="x", pady=5)  # Add to frame
-            self.cells.append(cell)  # Save reference
+        self.btn_add_cell = ctk.CTkButton(
+            self.cells_frame,
+            text="+ Add Exercise",
+            command=lambda: self._ensure_cell(len(self.cells)),  # Next cell
+            width=150
+        )
+        self.btn_add_cell.pack(pady=10)
+        self._ensure_cell(0)  # First cell
 
         # Bottom panel with buttons
         bottom_frame = ctk.CTkFrame(self)  # Bottom container
@@ -263,7 +384,7 @@ class WorkoutEditor(ctk.CTkToplevel):
         )
         btn_cancel.pack(side="right", padx=10)
 
-        btn_save = ctk.CTkButton(
+        self.btn_save = ctk.CTkButton(
             bottom_frame,
             text="Save",
             command=self.save_workout,  # Save handler
@@ -271,18 +392,35 @@ class WorkoutEditor(ctk.CTkToplevel):
             fg_color="green",  # Green button
             hover_color="darkgreen"  # Dark green hover
         )
-        btn_save.pack(side="right", padx=10)
+        self.btn_save.pack(side="right", padx=10)
+
+    def _ensure_cell(self, index):
+        # Create cells up to index
+        while len(self.cells) <= min(index, MAX_CELLS - 1):
+            cell = self.create_exercise_cell(len(self.cells))  # Create cell widget
+            cell.pack(fill="x", pady=5, before=self.btn_add_cell)  # Above add button
+            self.cells.append(cell)  # Save reference
+        if len(self.cells) >= MAX_CELLS:  # All cells shown
+            self.btn_add_cell.pack_forget()
+
+    def _icon_label(self, parent, **kwargs):
+        # Plain tk.Label for static icons, coloured like a CTkLabel on parent (theme changes need a restart)
+        bg = parent.cget("fg_color")  # Parent frame colour
+        if bg == "transparent":
+            bg = parent.cget("bg_color")  # Colour behind transparent frame
+        fg = ctk.ThemeManager.theme["CTkLabel"]["text_color"]  # Theme text colour
+        return tk.Label(parent, bg=_mode_color(bg), fg=_mode_color(fg), bd=0, **kwargs)
 
     def create_exercise_cell(self, index):
         # Create exercise cell
         cell_frame = ctk.CTkFrame(self.cells_frame)  # Cell container
 
         # Cell number
-        num_label = ctk.CTkLabel(
+        num_label = self._icon_label(
             cell_frame,
             text=f"{index + 1}.",  # Cell number (1-10)
-            font=ctk.CTkFont(size=16, weight="bold"),
-            width=30
+            font=self._number_font,
+            width=3
         )
         num_label.pack(side="left", padx=(10, 5))
 
@@ -291,7 +429,7 @@ class WorkoutEditor(ctk.CTkToplevel):
         preview_frame.pack(side="left", padx=5)
         preview_frame.pack_propagate(False)  # Fixed size
 
-        preview_label = ctk.CTkLabel(preview_frame, text="🎬", font=ctk.CTkFont(size=24))  # Video icon
+        preview_label = self._icon_label(preview_frame, text="🎬", font=self._icon_font)  # Video icon
         preview_label.pack(expand=True)
 
         # Save widget references
@@ -302,7 +440,7 @@ class WorkoutEditor(ctk.CTkToplevel):
         video_label = ctk.CTkLabel(
             cell_frame,
             text="Not selected",  # Default text
-            font=ctk.CTkFont(size=12),
+            font=self._name_font,
             width=220,
             anchor="w"  # Left align
         )
@@ -310,11 +448,11 @@ class WorkoutEditor(ctk.CTkToplevel):
         cell_frame.video_label = video_label  # Save reference
 
         # Validation status indicator
-        status_label = ctk.CTkLabel(
+        status_label = self._icon_label(
             cell_frame,
             text="",  # Empty by default
-            font=ctk.CTkFont(size=16),
-            width=25
+            font=self._status_font,
+            width=2
         )
         status_label.pack(side="left", padx=5)
         cell_frame.status_label = status_label  # Save reference
@@ -323,7 +461,7 @@ class WorkoutEditor(ctk.CTkToplevel):
         time_frame = ctk.CTkFrame(cell_frame, fg_color="transparent")  # Transparent container
         time_frame.pack(side="left", padx=5)
 
-        time_icon = ctk.CTkLabel(time_frame, text="🕐", font=ctk.CTkFont(size=16))  # Clock icon
+        time_icon = self._icon_label(time_frame, text="🕐", font=self._status_font)  # Clock icon
         time_icon.pack(side="left", padx=(0, 5))
 
         time_entry = ctk.CTkEntry(
@@ -335,8 +473,9 @@ class WorkoutEditor(ctk.CTkToplevel):
         cell_frame.time_entry = time_entry  # Save reference
 
         # Bind validation on time entry change
-        time_entry.bind('<FocusOut>', lambda e: self.validate_cell_duration(index))  # Validate on unfocus
-        time_entry.bind('<Return>', lambda e: self.validate_cell_duration(index))  # Validate on Enter
+        time_entry.cell_index = index  # Found by the shared handler
+        time_entry.bind('<FocusOut>', self._on_time_event)  # Validate on unfocus
+        time_entry.bind('<Return>', self._on_time_event)  # Validate on Enter
 
         # Select video button
         btn_select = ctk.CTkButton(
@@ -362,10 +501,26 @@ class WorkoutEditor(ctk.CTkToplevel):
         cell_frame.video_path = None  # No video initially
         cell_frame.cell_index = index  # Save index
         cell_frame.validation_error = None  # No error initially
+        cell_frame.last_time_str = None  # Time text of last duration check
+        cell_frame.last_time_valid = True  # Result of last duration check
 
         return cell_frame  # Return widget
 
-    def validate_cell_video(self, cell_index):
+    def _on_time_event(self, event):
+        # Queue duration validation, runs once rapid tabbing stops
+        self._pending_cells.add(event.widget.master.cell_index)  # Inner tk entry -> CTkEntry
+        if self._validate_after_id:
+            self.after_cancel(self._validate_after_id)  # Restart delay
+        self._validate_after_id = self.after(self.VALIDATE_DELAY, self._validate_pending_cells)
+
+    def _validate_pending_cells(self):
+        # Validate all cells edited since the last run
+        self._validate_after_id = None  # Nothing scheduled
+        pending, self._pending_cells = self._pending_cells, set()
+        for cell_index in sorted(pending):
+            self.validate_cell_duration(cell_index)  # Check duration
+
+    def validate_cell_video(self, cell_index, decode=True):
         # Validate video in cell
         cell = self.cells[cell_index]  # Get cell
 
@@ -374,14 +529,17 @@ class WorkoutEditor(ctk.CTkToplevel):
             return True  # Valid (empty)
 
         # Validate video path
-        is_valid, error = validate_video_path(cell.video_path)  # Check video
+        is_valid, error = validate_video_path(cell.video_path, decode)  # Check video
+        return self._show_video_status(cell, is_valid, error)
 
+    def _show_video_status(self, cell, is_valid, error):
+        # Show video check result in cell
         if is_valid:  # Video is valid
-            cell.status_label.configure(text="✓", text_color="green")  # Green checkmark
+            cell.status_label.configure(text="✓", fg="green")  # Green checkmark
             cell.validation_error = None  # Clear error
             return True  # Valid
         else:  # Video is invalid
-            cell.status_label.configure(text="✗", text_color="red")  # Red X
+            cell.status_label.configure(text="✗", fg="red")  # Red X
             cell.validation_error = error  # Save error
             return False  # Invalid
 
@@ -390,7 +548,15 @@ class WorkoutEditor(ctk.CTkToplevel):
         cell = self.cells[cell_index]  # Get cell
 
         time_str = cell.time_entry.get().strip()  # Get time text
+        if time_str == cell.last_time_str:  # Unchanged, border already shows the result
+            return cell.last_time_valid
 
+        cell.last_time_str = time_str  # Remember checked text
+        cell.last_time_valid = self._check_cell_duration(cell, time_str)
+        return cell.last_time_valid
+
+    def _check_cell_duration(self, cell, time_str):
+        # Validate duration text and colour the entry border
         if not time_str:  # Empty field
             cell.time_entry.configure(border_color="gray")  # Gray border
             return True  # Valid (empty)
@@ -423,10 +589,10 @@ class WorkoutEditor(ctk.CTkToplevel):
         self.wait_window(dialog)  # Wait for close
 
         if dialog.selected_video:  # Video was selected
-            video_path = os.path.join(self.gallery_path, dialog.selected_video)  # Full path
+            video_path = self._gallery_prefix + dialog.selected_video  # Full path
 
-            # Validate video before setting
-            is_valid, error = validate_video_path(video_path)  # Check video
+            # Validate video before setting (decoded on save)
+            is_valid, error = validate_video_path(video_path, decode=False)  # Check video
 
             if is_valid:  # Video is valid
                 self.set_cell_video(cell_index, dialog.selected_video)  # Set video
@@ -439,24 +605,17 @@ class WorkoutEditor(ctk.CTkToplevel):
     def set_cell_video(self, cell_index, video_filename):
         # Set video in cell
         cell = self.cells[cell_index]  # Get cell
-        video_path = os.path.join(self.gallery_path, video_filename)  # Full path
+        video_path = self._gallery_prefix + video_filename  # Full path
 
         # Update data
         cell.video_path = video_path  # Save path
         cell.video_label.configure(text=video_filename)  # Show filename
 
         # Validate
-        self.validate_cell_video(cell_index)  # Validate video
+        self.validate_cell_video(cell_index, decode=False)  # Header only, decoded on save
 
         # Update preview
-        try:
-            prev = generate_video_prev(video_path, size=(80, 60))  # Create preview
-            if prev:  # Preview created
-                photo = ImageTk.PhotoImage(prev)  # Convert to Tkinter
-                cell.preview_label.configure(image=photo, text="")  # Show image
-                cell.preview_label.image = photo  # Keep reference
-        except:
-            pass  # Ignore errors
+        load_preview_async(self, cell.preview_label, video_path)  # Decoded in background
 
     def clear_cell(self, cell_index):
         # Clear cell
@@ -469,10 +628,11 @@ class WorkoutEditor(ctk.CTkToplevel):
         cell.time_entry.configure(border_color="gray")  # Gray border
         cell.status_label.configure(text="")  # Clear status
         cell.validation_error = None  # Clear error
+        cell.last_time_str = None  # Check again next time
 
         # Reset preview
-        cell.preview_label.configure(image="", text="🎬")  # Show icon
-        cell.preview_label.image = None  # Remove reference
+        cell.preview_label.configure(image="", text="🎬")  # Show icon, Tk image kept for next video
+        cell.preview_label.preview_path = None  # Ignore preview still loading
 
     def load_workout_data(self):
         # Load workout data into editor
@@ -482,7 +642,8 @@ class WorkoutEditor(ctk.CTkToplevel):
 
         # Exercises
         for i, exercise in enumerate(self.workout.exercises):  # Loop exercises
-            if exercise and i < 10:  # Valid exercise
+            if exercise and i < MAX_CELLS:  # Valid exercise
+                self._ensure_cell(i)  # Create cell if needed
                 cell = self.cells[i]  # Get cell
 
                 # Video
@@ -498,13 +659,14 @@ class WorkoutEditor(ctk.CTkToplevel):
                 self.validate_cell_duration(i)  # Validate duration
 
     def save_workout(self):
-        # Save workout with validation
+        # Save workout with validation (videos are decoded in background, then _finish_save runs)
         # Get name
         name = self.name_entry.get().strip()  # Get workout name
 
         # Collect exercises from cells
         exercises = []  # Empty list
         has_validation_errors = False  # No errors yet
+        probes = {}  # cell index -> video path to decode
 
         for i, cell in enumerate(self.cells):  # Loop cells
             if cell.video_path:  # Has video
@@ -513,12 +675,10 @@ class WorkoutEditor(ctk.CTkToplevel):
                 duration = parse_time_input(time_str)  # Parse to seconds
 
                 if duration > 0:  # Valid duration
-                    # Validate before adding
-                    video_valid = self.validate_cell_video(i)  # Check video
-                    duration_valid = self.validate_cell_duration(i)  # Check duration
-
-                    if not video_valid or not duration_valid:  # Has errors
+                    # Validate before adding, video below
+                    if not self.validate_cell_duration(i):  # Check duration
                         has_validation_errors = True  # Mark errors
+                    probes[i] = cell.video_path
 
                     exercise = Exercise(cell.video_path, duration)  # Create exercise
                     exercises.append(exercise)  # Add to list
@@ -529,6 +689,45 @@ class WorkoutEditor(ctk.CTkToplevel):
             else:
                 exercises.append(None)  # Add None
 
+        # Decode all videos in parallel, window stays responsive
+        self.btn_save.configure(text="Checking...", state="disabled")  # No second save meanwhile
+        self._save_state = (name, exercises, has_validation_errors, probes, {})
+        if not probes:
+            self._finish_save()
+            return
+        for i, video_path in probes.items():
+            future = _VALIDATE_EXECUTOR.submit(validate_video_path, video_path)
+            future.add_done_callback(functools.partial(self._post_probe, i))
+
+    def _post_probe(self, cell_index, future):
+        # Hand video check result to Tk thread (runs in worker thread)
+        try:
+            self.after(0, self._on_probe_done, cell_index, future)
+        except (RuntimeError, TclError):
+            pass  # Editor closed
+
+    def _on_probe_done(self, cell_index, future):
+        # Show one video check, finish saving after the last one
+        if not self.winfo_exists():  # Editor closed meanwhile
+            return
+        name, exercises, has_validation_errors, probes, results = self._save_state
+        try:
+            results[cell_index] = future.result()  # (is_valid, error)
+        except Exception as e:
+            results[cell_index] = (False, f"Error validating video: {e}")
+        cell = self.cells[cell_index]
+        if cell.video_path == probes[cell_index]:  # Video not changed meanwhile
+            self._show_video_status(cell, *results[cell_index])
+        if len(results) == len(probes):  # All checked
+            self._finish_save()
+
+    def _finish_save(self):
+        # Ask about problems and write workout (Tk thread, all videos checked)
+        self.btn_save.configure(text="Save", state="normal")
+        name, exercises, has_validation_errors, probes, video_results = self._save_state
+        if not all(is_valid for is_valid, _ in video_results.values()):  # Marked with ✗
+            has_validation_errors = True
+
         # Check if there are validation errors
         if has_validation_errors:  # Has errors
             response = messagebox.askyesno(
@@ -554,7 +753,7 @@ class WorkoutEditor(ctk.CTkToplevel):
         self.workout.exercises = exercises  # Set exercises
 
         # Validate complete workout
-        is_valid, errors, warnings = validate_workout(self.workout)  # Validate all
+        is_valid, errors, warnings = validate_workout(self.workout, video_results)  # Videos already checked
 
         # Show warnings if any
         if warnings:  # Has warnings
@@ -579,17 +778,30 @@ class WorkoutEditor(ctk.CTkToplevel):
             )
             return  # Exit function
 
-        # Save to JSON
-        workouts = self.data_manager.load_workouts()  # Load all workouts
-
+        # Save to JSON in background, result reported by _on_workout_written
         if self.workout_index is not None:  # Editing existing
-            # Update existing
-            workouts[self.workout_index] = self.workout  # Replace workout
+            future = self.data_manager.update_workout(self.workout_index, self.workout)  # Replace workout
         else:
-            # Add new
-            workouts.append(self.workout)  # Add to list
+            future = self.data_manager.add_workout(self.workout)  # Add to list
+        self.btn_save.configure(text="Saving...", state="disabled")
+        future.add_done_callback(self._post_workout_written)
 
-        self.data_manager.save_workouts(workouts)  # Save to file
+    def _post_workout_written(self, future):
+        # Hand write result to Tk thread (runs in writer thread)
+        try:
+            self.after(0, self._on_workout_written, future)
+        except (RuntimeError, TclError):
+            pass  # Editor closed
+
+    def _on_workout_written(self, future):
+        # Report save result and close editor
+        if not self.winfo_exists():  # Editor closed meanwhile
+            return
+        error = future.exception()
+        if error:  # Write failed
+            self.btn_save.configure(text="Save", state="normal")  # Editor stays open to retry
+            messagebox.showerror("Save Failed", f"Cannot save workout:\n{error}")
+            return
 
         # Update workout list in main window
         if hasattr(self.master_window, 'show_workouts_view'):  # Main window has method
@@ -608,6 +820,13 @@ class WorkoutEditor(ctk.CTkToplevel):
         # Cancel editing
         self.destroy()  # Close window
 
+    def destroy(self):
+        # Drop pending validation before widgets go away
+        if self._validate_after_id:
+            self.after_cancel(self._validate_after_id)
+            self._validate_after_id = None
+        super().destroy()
+
 
 # ============================================================
 # Video selection dialog
@@ -616,11 +835,22 @@ class WorkoutEditor(ctk.CTkToplevel):
 class VideoSelectionDialog(ctk.CTkToplevel):
     # Video selection dialog from gallery or adding new
 
+    RENDER_BATCH = 12  # Rows built per scroll step
+
     def __init__(self, master, gallery_path):
         super().__init__(master)  # Initialize parent
 
         self.gallery_path = gallery_path  # Gallery path
+        self._gallery_prefix = os.path.join(gallery_path, "")  # Folder with separator, for building paths
         self.selected_video = None  # No selection yet
+        self._video_files = []  # DirEntry of listed videos
+        self._rendered = 0  # Rows with widgets
+        self._render_pending = False  # Batch scheduled
+        self._preview_futures = []  # Pending preview jobs
+
+        # Fonts shared by all rows
+        self._icon_font = ctk.CTkFont(size=24)  # Preview placeholder
+        self._name_font = ctk.CTkFont(size=12)  # Video name
 
         self.title("Select Video")  # Dialog title
         self.geometry("600x500")  # Dialog size
@@ -643,17 +873,18 @@ class VideoSelectionDialog(ctk.CTkToplevel):
         label.pack(pady=20)
 
         # Add new video button
-        btn_add = ctk.CTkButton(
+        self.btn_add = ctk.CTkButton(
             self,
             text="+ Add video from device",
             command=self.add_from_device,  # Add video handler
             width=250
         )
-        btn_add.pack(pady=10)
+        self.btn_add.pack(pady=10)
 
         # Videos list
         self.videos_frame = ctk.CTkScrollableFrame(self, height=300)  # Scrollable list
         self.videos_frame.pack(fill="both", expand=True, padx=20, pady=10)
+        self.videos_frame._parent_canvas.configure(yscrollcommand=self._on_scroll)  # Lazy row building
 
         self.load_videos()  # Load videos
 
@@ -676,10 +907,9 @@ class VideoSelectionDialog(ctk.CTkToplevel):
         if not os.path.exists(self.gallery_path):  # Gallery missing
             os.makedirs(self.gallery_path, exist_ok=True)  # Create folder
 
-        video_files = []  # Empty list
-        for filename in os.listdir(self.gallery_path):  # Loop files
-            if filename.lower().endswith(('.mp4', '.avi', '.mkv', '.mov')):  # Video format
-                video_files.append(filename)  # Add to list
+        with os.scandir(self.gallery_path) as it:  # One pass, path and stat reused for previews
+            video_files = [entry for entry in it
+                           if os.path.splitext(entry.name)[1].lower() in LIBRARY_FORMATS and entry.is_file()]
 
         if not video_files:  # No videos
             label = ctk.CTkLabel(
@@ -690,39 +920,48 @@ class VideoSelectionDialog(ctk.CTkToplevel):
             label.pack(pady=30)
             return  # Exit function
 
-        # Display videos
-        for filename in video_files:  # Each video
-            self.create_video_row(filename)  # Create row
-
-    def create_video_row(self, filename):
+        # Display first batch, the rest is built while scrolling
+        self._video_files = video_files  # All listed videos
+        self._rendered = 0
+        self.render_more()
+
+    def render_more(self):
+        # Build rows for the next batch of videos
+        self._render_pending = False
+        start = self._rendered  # First video without row
+        end = min(start + self.RENDER_BATCH, len(self._video_files))  # Batch end
+        for entry in self._video_files[start:end]:  # Each video
+            self.create_video_row(entry)  # Create row
+        self._rendered = end
+
+    def _on_scroll(self, first, last):
+        # Scrollbar update, build more rows near the bottom
+        self.videos_frame._scrollbar.set(first, last)  # Default behaviour
+        if float(last) > 0.9 and not self._render_pending and self._rendered < len(self._video_files):
+            self._render_pending = True  # One batch at a time
+            self.after_idle(self.render_more)
+
+    def create_video_row(self, entry):
         # Create video row
         row = ctk.CTkFrame(self.videos_frame)  # Row container
         row.pack(fill="x", pady=5, padx=10)
+        filename = entry.name  # Video filename
 
         # Preview
-        video_path = os.path.join(self.gallery_path, filename)  # Full path
         preview_frame = ctk.CTkFrame(row, width=80, height=60, fg_color="gray20")  # Preview container
         preview_frame.pack(side="left", padx=5)
         preview_frame.pack_propagate(False)  # Fixed size
 
-        try:
-            prev = generate_video_prev(video_path, size=(80, 60))  # Create preview
-            if prev:  # preview created
-                photo = ImageTk.PhotoImage(prev)
-                preview_label = ctk.CTkLabel(preview_frame, image=photo, text="")  # Show image
-                preview_label.image = photo  # Keep reference
-                preview_label.pack()
-            else:
-                raise Exception("No preview")  # Trigger fallback
-        except:
-            preview_label = ctk.CTkLabel(preview_frame, text="🎬", font=ctk.CTkFont(size=24))  # Video icon
-            preview_label.pack(expand=True)
+        preview_label = self._icon_label(preview_frame, text="🎬", font=self._icon_font)  # Video icon until decoded
+        preview_label.pack(expand=True)
+        future = load_preview_async(self, preview_label, entry.path, entry.stat())  # Decoded in background, stat cached by scandir
+        self._preview_futures.append(future)
 
         # Name
         name_label = ctk.CTkLabel(
             row,
             text=filename,  # Video name
-            font=ctk.CTkFont(size=12),
+            font=self._name_font,
             anchor="w"  # Left align
         )
         name_label.pack(side="left", padx=10, fill="x", expand=True)
@@ -741,6 +980,12 @@ class VideoSelectionDialog(ctk.CTkToplevel):
         self.selected_video = filename  # Save selection
         self.destroy()  # Close dialog
 
+    def destroy(self):
+        # Drop queued previews with the dialog (workers are shared)
+        for future in self._preview_futures:
+            future.cancel()
+        super().destroy()
+
     def add_from_device(self):
         # Add video from device
         filetypes = (  # Allowed types
@@ -765,21 +1010,43 @@ class VideoSelectionDialog(ctk.CTkToplevel):
                 return  # Exit function
 
             # Copy to gallery
-            import shutil
             basename = os.path.basename(filename)  # Get filename
-            dest_path = os.path.join(self.gallery_path, basename)  # Destination path
-
-            # Check if exists
-            if os.path.exists(dest_path):  # File exists
-                name, ext = os.path.splitext(basename)  # Split name/extension
-                counter = 1  # Start counter
-                while os.path.exists(dest_path):  # Find unique name
-                    basename = f"{name}_{counter}{ext}"  # Add counter
-                    dest_path = os.path.join(self.gallery_path, basename)  # New path
-                    counter += 1  # Increment counter
-
-            shutil.copy2(filename, dest_path)  # Copy file
-
-            # Select this video
-            self.selected_video = basename  # Save selection
-            self.destroy()  # Close dialog
\ No newline at end of file
+
+            # Add number if file exists
+            with os.scandir(self.gallery_path) as it:
+                basename = unique_filename(basename, {entry.name for entry in it})  # One directory read
+            dest_path = self._gallery_prefix + basename  # Destination path
+
+            # Copy without blocking the window
+            self.btn_add.configure(text="Copying...", state="disabled")  # Progress
+            threading.Thread(target=self._copy_video, args=(filename, dest_path, basename)).start()
+
+    def _copy_video(self, src, dest_path, basename):
+        # Copy video to gallery (runs in worker thread)
+        try:
+            duplicate = find_gallery_duplicate(src, self.gallery_path)  # Same video already imported
+            if duplicate:
+                basename = duplicate  # Reuse it, no copy
+            else:
+                copy_video_file(src, dest_path)  # Kernel copy where possible
+                warm_preview_cache(dest_path, (PREVIEW_BOX, NEXT_PREVIEW_SIZE))  # Cell and player previews
+            error = None
+        except OSError as e:
+            error = str(e)
+        try:
+            self.after(0, self._on_video_copied, basename, error)
+        except (RuntimeError, TclError):
+            pass  # Dialog was closed
+
+    def _on_video_copied(self, basename, error):
+        # Select copied video
+        if not self.winfo_exists():  # Dialog closed during copy
+            return
+        if error:  # Copy failed
+            self.btn_add.configure(text="+ Add video from device", state="normal")  # Allow retry
+            messagebox.showerror("Copy Failed", f"Cannot add this video:\n{error}")
+            return
+
+        # Select this video
+        self.selected_video = basename  # Save selection
+        self.destroy()  # Close dialog
\ No newline at end of file
@@ -4,23 +4,39 @@
 # ============================================================
 
 import customtkinter as ctk
+import tkinter as tk
 import cv2
-from PIL import Image, ImageTk
-import threading
+from PIL import ImageTk
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from models import Database
-from utils import seconds_to_mmss, generate_video_prev
+from models import Database, sqlite3  # Same sqlite3 module (maybe pysqlite3) as Database
+from utils import seconds_to_mmss, get_memo_prev, open_video_capture, NEXT_PREVIEW_SIZE, THUMB_EXECUTOR
+
+LOOP_CACHE_SECONDS = 30  # Only clips this short loop from memory
+LOOP_CACHE_BYTES = 64 * 1024 * 1024  # Hard ceiling for cached frames (at canvas size)
+_SESSION_WRITER = ThreadPoolExecutor(max_workers=1)  # Session writes and DB close, in order
+_OPEN_AHEAD = ThreadPoolExecutor(max_workers=1)  # Next exercise's capture, opened during rest
+
+
+def _release_opened(future):
+    # Release a capture opened ahead but not used
+    if not future.cancelled() and future.exception() is None:
+        future.result()[0].release()
 
 
 class WorkoutPlayer(ctk.CTkToplevel):
     # Workout playback window
 
+    REST_SECONDS = 10  # Rest between exercises
+
     def __init__(self, master, workout):
         super().__init__(master)
 
         self.workout = workout
         self.db = Database()
+        self._alive = True  # False once the window is destroyed
 
         # Playback state
         self.is_playing = False
@@ -30,8 +46,14 @@ class WorkoutPlayer(ctk.CTkToplevel):
         self.current_exercise_index = 0
         self.current_time = 0  # Current exercise time in seconds
         self.total_elapsed = 0  # Total workout elapsed time
-        self.session_id = None  # DB session ID
+        self.session_id = None  # DB session ID, set by writer thread
+        self._session_saved = False  # Final duration written to DB
         self.session_start_time = None
+        self._tick_after_id = None  # Next scheduled frame
+        self._rest_after_id = None  # Next rest timer update
+        self._next_capture = None  # (index, future) of capture opened during rest
+        self._prefetched = deque()  # Frames read ahead while resting
+        self._reset_loop_cache()
 
         # Get list of non-empty exercises
         self.exercises = [ex for ex in workout.exercises if ex is not None]
@@ -42,8 +64,8 @@ class WorkoutPlayer(ctk.CTkToplevel):
 
         # Video
         self.video_capture = None
-        self.video_thread = None
-        self.stop_video_thread = False
+        self.fps = 30
+        self._canvas_size = (0, 0)  # Updated on canvas resize
 
         # Window setup
         self.title(f"Workout: {workout.name if workout.name else 'Untitled'}")
@@ -74,6 +96,7 @@ class WorkoutPlayer(ctk.CTkToplevel):
             highlightthickness=0
         )
         self.video_canvas.pack(fill="both", expand=True)
+        self.video_canvas.bind("<Configure>", self._on_canvas_resize)
 
         # Current exercise timer (overlay on video)
         self.exercise_timer_label = ctk.CTkLabel(
@@ -140,15 +163,10 @@ class WorkoutPlayer(ctk.CTkToplevel):
 
     def start_workout(self):
         # Start workout
-        # Record start in DB
+        # Record start in DB (in background, row survives a crash mid-workout)
         workout_name = self.workout.name if self.workout.name else "Untitled"
         self.session_start_time = datetime.now()
-        self.session_id = self.db.add_workout_session(
-            workout_name,
-            self.session_start_time,
-            0,
-            False
-        )
+        _SESSION_WRITER.submit(self._insert_session, workout_name, self.session_start_time)
 
         # Load first exercise
         self.load_exercise(0)
@@ -165,8 +183,8 @@ class WorkoutPlayer(ctk.CTkToplevel):
 
         exercise = self.exercises[index]
 
-        # Stop previous video (but don't join from same thread)
-        self.stop_video_thread = True
+        # Stop previous video
+        self.stop_video_playback()
         if self.video_capture:
             self.video_capture.release()
             self.video_capture = None
@@ -175,8 +193,26 @@ class WorkoutPlayer(ctk.CTkToplevel):
         total = len(self.exercises)
         self.progress_label.configure(text=f"Exercise {index + 1} of {total}")
 
-        # Load video
-        self.video_capture = cv2.VideoCapture(exercise.video_path)
+        # Prepare next exercise preview while this one plays
+        if index + 1 < total:
+            THUMB_EXECUTOR.submit(get_memo_prev, self.exercises[index + 1].video_path, NEXT_PREVIEW_SIZE)
+
+        # Load video, GPU decoding when available (usually opened during rest)
+        self._prefetched.clear()
+        self._reset_loop_cache()
+        next_capture, self._next_capture = self._next_capture, None
+        if next_capture and next_capture[0] == index and next_capture[1].done():  # Ready, never wait
+            try:
+                self.video_capture, frames = next_capture[1].result()
+                self._prefetched.extend(frames)
+            except Exception as e:
+                print(f"Open-ahead error: {e}")  # Print error
+                next_capture = None  # Open again below
+        else:
+            self._discard_capture(next_capture)
+            next_capture = None
+        if not next_capture:
+            self.video_capture = open_video_capture(exercise.video_path, decoder_threads=None)
 
         if not self.video_capture.isOpened():
             print(f"Error opening video: {exercise.video_path}")
@@ -189,75 +225,153 @@ class WorkoutPlayer(ctk.CTkToplevel):
         if self.fps == 0:
             self.fps = 30  # Default
 
+        # Long clips are never cached, decode every loop
+        frame_count = self.video_capture.get(cv2.CAP_PROP_FRAME_COUNT)
+        self._loop_max_frames = int(LOOP_CACHE_SECONDS * self.fps)
+        if not 0 < frame_count <= self._loop_max_frames:
+            self._loop_frames = None
+
         # Start playback if not paused
         if self.is_playing and not self.is_paused:
             self.start_video_playback()
 
-    def start_video_playback(self):
-        # Start video playback
-        self.stop_video_thread = False
-        self.video_thread = threading.Thread(target=self.video_loop, daemon=True)
-        self.video_thread.start()
-
-    def video_loop(self):
-        # Video playback loop
-        exercise = self.exercises[self.current_exercise_index]
-        duration = exercise.duration
-
-        frame_delay = 1.0 / self.fps
-
-        while not self.stop_video_thread and self.current_time < duration:
-            if self.is_paused:
-                time.sleep(0.1)
-                continue
-
-            # Read frame
-            ret, frame = self.video_capture.read()
-
+    @staticmethod
+    def _open_ahead(video_path, frame_count=2):
+        # Open video and read first frames (runs in worker thread)
+        cap = open_video_capture(video_path, decoder_threads=None)
+        frames = []
+        while cap.isOpened() and len(frames) < frame_count:
+            ret, frame = cap.read()
             if not ret:
-                # Loop video
-                self.video_capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
-                continue
+                break
+            frames.append(frame)
+        return cap, frames
 
-            # Convert to RGB
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    def _discard_capture(self, next_capture):
+        # Release capture opened ahead once its worker finishes
+        if next_capture:
+            next_capture[1].add_done_callback(_release_opened)
 
-            # Display frame
-            self.display_frame(frame)
+    def start_video_playback(self):
+        # Start video playback, frames are scheduled on the Tk event loop
+        self.stop_video_playback()  # Only one frame chain
+        self._last_tick = time.monotonic()  # Timer baseline
+        self._playback_start = self._last_tick  # Frame schedule baseline
+        self._frames_shown = 0
+        self._tick()
+
+    def stop_video_playback(self):
+        # Cancel next scheduled frame
+        if self._tick_after_id:
+            self.after_cancel(self._tick_after_id)
+            self._tick_after_id = None
+
+    def _tick(self):
+        # Show one frame and schedule the next one
+        self._tick_after_id = None
+        if self.is_paused or not self.video_capture:  # Resume restarts playback
+            return
 
-            # Update timers
-            self.current_time += frame_delay
-            self.total_elapsed += frame_delay
-            self.update_timers()
+        # Advance timers by real elapsed time
+        now = time.monotonic()
+        elapsed = now - self._last_tick
+        self._last_tick = now
+        self.current_time += elapsed
+        self.total_elapsed += elapsed
 
-            time.sleep(frame_delay)
+        exercise = self.exercises[self.current_exercise_index]
+        if self.current_time >= exercise.duration:  # Exercise completed
+            self.on_exercise_complete()
+            return
 
-        # Exercise completed - schedule on main thread
-        if not self.stop_video_thread:
-            self.after(0, self.on_exercise_complete)
+        ppm = self._next_frame()
+        if ppm:
+            self.show_frame(ppm)
+        self.update_timers()
+
+        # Next frame time from the start, so delays don't add up
+        self._frames_shown += 1
+        target = self._playback_start + self._frames_shown / self.fps
+        delay = max(1, int((target - time.monotonic()) * 1000))
+        self._tick_after_id = self.after(delay, self._tick)
+
+    def _next_frame(self):
+        # Next frame as PPM bytes, short clips loop from memory
+        if self._loop_pos is not None:  # Whole clip cached
+            ppm = self._loop_frames[self._loop_pos]
+            self._loop_pos = (self._loop_pos + 1) % len(self._loop_frames)
+            return ppm
+
+        # Read frame
+        if self._prefetched:  # Read ahead during rest
+            ret, frame = True, self._prefetched.popleft()
+        else:
+            ret, frame = self.video_capture.read()
+        if not ret:
+            if self._loop_frames:  # First pass cached, no seek
+                self._loop_pos = 1 % len(self._loop_frames)
+                return self._loop_frames[0]
+            # Loop video
+            self.video_capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.video_capture.read()
+            if not ret:
+                return None
 
-    def display_frame(self, frame):
-        # Display frame on canvas
+        ppm = self.frame_to_ppm(frame)
+        if self._loop_frames is not None:  # Still caching first pass
+            self._loop_bytes += len(ppm) if ppm else 0
+            if ppm and len(self._loop_frames) < self._loop_max_frames and self._loop_bytes <= LOOP_CACHE_BYTES:
+                self._loop_frames.append(ppm)
+            else:
+                self._loop_frames = None  # Clip too long (or frame missing), decode every loop
+        return ppm
+
+    def _reset_loop_cache(self):
+        # Start caching frames of a new clip
+        self._loop_frames = []  # PPM frames of first pass, None when not cached
+        self._loop_bytes = 0
+        self._loop_pos = None  # Position in cache once the clip loops
+
+    def _on_canvas_resize(self, event):
+        # Remember canvas size, so frames don't query it
+        if (event.width, event.height) == self._canvas_size:
+            return
+        self._canvas_size = (event.width, event.height)
+        if self._loop_frames:  # Cached frames have old size
+            if self._loop_pos is not None and self.video_capture:
+                self.video_capture.set(cv2.CAP_PROP_POS_FRAMES, 0)  # Decode again from start
+            self._loop_frames = None
+            self._loop_pos = None
+
+    def frame_to_ppm(self, frame):
+        # BGR frame to PPM bytes sized for the canvas
+        canvas_width, canvas_height = self._canvas_size
+        if canvas_width <= 1 or canvas_height <= 1:
+            return None
+
+        # Shrink frame to fit canvas, keeping aspect ratio
+        frame_height, frame_width = frame.shape[:2]
+        scale = min(canvas_width / frame_width, canvas_height / frame_height)
+        if scale < 1:
+            size = (max(1, int(frame_width * scale)), max(1, int(frame_height * scale)))
+            frame = cv2.resize(frame, size, interpolation=cv2.INTER_LINEAR)
+            frame_width, frame_height = size
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)  # Convert the small frame
+
+        # Raw PPM bytes straight into PhotoImage, no PIL copies
+        return b"P6\n%d %d\n255\n" % (frame_width, frame_height) + frame.tobytes()
+
+    def show_frame(self, ppm):
+        # Display PPM frame on canvas
         try:
-            # Check if canvas still exists
-            if not self.video_canvas.winfo_exists():
-                return
-
-            # Get canvas dimensions
-            canvas_width = self.video_canvas.winfo_width()
-            canvas_height = self.video_canvas.winfo_height()
-
-            if canvas_width <= 1 or canvas_height <= 1:
+            # Check if window still exists
+            if not self._alive:
                 return
 
-            # Resize frame
-            img = Image.fromarray(frame)
-            img.thumbnail((canvas_width, canvas_height))
-
-            # Convert to PhotoImage
-            photo = ImageTk.PhotoImage(img)
+            photo = tk.PhotoImage(master=self.video_canvas, data=ppm)
 
             # Display on canvas
+            canvas_width, canvas_height = self._canvas_size
             self.video_canvas.delete("all")
             self.video_canvas.create_image(
                 canvas_width // 2,
@@ -274,28 +388,31 @@ class WorkoutPlayer(ctk.CTkToplevel):
     def update_timers(self):
         # Update timers
         try:
-            # Check if widgets still exist
-            if not self.exercise_timer_label.winfo_exists() or not self.total_timer_label.winfo_exists():
+            # Check if window still exists
+            if not self._alive:
                 return
 
             exercise = self.exercises[self.current_exercise_index]
             remaining = exercise.duration - self.current_time
 
-            # Exercise timer
+            # Exercise timer, redraw only when the second changes
             timer_text = seconds_to_mmss(int(remaining))
-            self.exercise_timer_label.configure(text=timer_text)
+            if self.exercise_timer_label.cget("text") != timer_text:
+                self.exercise_timer_label.configure(text=timer_text)
 
             # Total timer
             total_text = f"Total Time: {seconds_to_mmss(int(self.total_elapsed))}"
-            self.total_timer_label.configure(text=total_text)
+            if self.total_timer_label.cget("text") != total_text:
+                self.total_timer_label.configure(text=total_text)
         except Exception as e:
             # Silently ignore timer errors (widget might be destroyed)
             pass
 
     def on_exercise_complete(self):
         # Exercise completion handler
-        # Stop video capture (but don't join thread - we're in it!)
-        self.stop_video_thread = True
+        # Stop video capture
+        self.stop_video_playback()
+        self._reset_loop_cache()  # Free cached frames during rest
         if self.video_capture:
             self.video_capture.release()
             self.video_capture = None
@@ -317,11 +434,15 @@ class WorkoutPlayer(ctk.CTkToplevel):
         self.video_canvas.delete("all")
 
         # Get next exercise
-        next_exercise = self.exercises[self.current_exercise_index + 1]
+        next_index = self.current_exercise_index + 1
+        next_exercise = self.exercises[next_index]
+
+        # Open next video during the countdown
+        self._next_capture = (next_index, _OPEN_AHEAD.submit(self._open_ahead, next_exercise.video_path))
 
         # Show preview
         try:
-            prev = generate_video_prev(next_exercise.video_path, size=(400, 300))
+            prev = get_memo_prev(next_exercise.video_path, NEXT_PREVIEW_SIZE)  # Usually ready in memory
             if prev:
                 photo = ImageTk.PhotoImage(prev)
 
@@ -348,35 +469,50 @@ class WorkoutPlayer(ctk.CTkToplevel):
         )
 
         # Countdown 10 seconds
-        self.rest_countdown(10)
+        self.rest_countdown(self.REST_SECONDS)
 
     def rest_countdown(self, seconds):
-        # Rest period countdown
-        # Check if window still exists
-        try:
-            if not self.winfo_exists():
-                return
-        except:
+        # Start or resume rest countdown, ends at an absolute deadline
+        self._rest_last = time.monotonic()  # Total timer baseline
+        self._rest_deadline = self._rest_last + seconds
+        self._poll_rest()
+
+    def pause_rest(self):
+        # Stop rest countdown, remember remaining time
+        if self._rest_after_id:
+            self.after_cancel(self._rest_after_id)
+            self._rest_after_id = None
+        now = time.monotonic()
+        self.total_elapsed += now - self._rest_last
+        self._rest_left = max(0, self._rest_deadline - now)
+
+    def _poll_rest(self):
+        # Update rest timer until the deadline
+        self._rest_after_id = None
+        if not self._alive or not self.is_resting or self.is_paused:
             return
 
-        if seconds > 0 and self.is_resting and not self.is_paused:
-            # Show timer
-            try:
-                self.exercise_timer_label.configure(text=f"Rest: {seconds}")
-
-                # Update total timer
-                self.total_elapsed += 1
-                total_text = f"Total Time: {seconds_to_mmss(int(self.total_elapsed))}"
-                self.total_timer_label.configure(text=total_text)
+        # Advance total timer by real elapsed time
+        now = time.monotonic()
+        self.total_elapsed += now - self._rest_last
+        self._rest_last = now
 
-                # Next second
-                self.after(1000, lambda: self.rest_countdown(seconds - 1))
-            except:
-                pass
-        elif self.is_resting and not self.is_paused:
+        remaining = self._rest_deadline - now
+        if remaining <= 0:
             # Rest period finished - load next exercise
             self.is_resting = False
             self.next_exercise()
+            return
+
+        # Show timer, redraw only when the second changes
+        rest_text = f"Rest: {int(remaining) + 1}"
+        if self.exercise_timer_label.cget("text") != rest_text:
+            self.exercise_timer_label.configure(text=rest_text)
+        total_text = f"Total Time: {seconds_to_mmss(int(self.total_elapsed))}"
+        if self.total_timer_label.cget("text") != total_text:
+            self.total_timer_label.configure(text=total_text)
+
+        self._rest_after_id = self.after(100, self._poll_rest)
 
     def next_exercise(self):
         # Move to next exercise
@@ -394,13 +530,14 @@ class WorkoutPlayer(ctk.CTkToplevel):
             self.is_paused = not self.is_paused
             if self.is_paused:
                 self.play_pause_btn.configure(text="▶ Continue")
+                if self.is_resting:
+                    self.pause_rest()
             else:
                 self.play_pause_btn.configure(text="⏸ Pause")
                 # Resume video or rest countdown
                 if self.is_resting:
-                    # Rest countdown will resume automatically via its condition check
-                    pass
-                elif not self.video_thread or not self.video_thread.is_alive():
+                    self.rest_countdown(self._rest_left)
+                else:
                     self.start_video_playback()
 
     def toggle_fullscreen(self):
@@ -416,18 +553,13 @@ class WorkoutPlayer(ctk.CTkToplevel):
     def finish_workout(self, completed=True):
         # Finish workout
         # Stop video
-        self.stop_video_thread = True
+        self.stop_video_playback()
         if self.video_capture:
             self.video_capture.release()
             self.video_capture = None
 
-        # Update DB record
-        if self.session_id:
-            self.db.update_workout_session(
-                self.session_id,
-                int(self.total_elapsed),
-                completed
-            )
+        # Save DB record
+        self.save_session(completed)
 
         # Show message
         if completed:
@@ -449,10 +581,44 @@ class WorkoutPlayer(ctk.CTkToplevel):
         except:
             pass
 
+    def save_session(self, completed):
+        # Update session record once, in background (after the start insert)
+        if self._session_saved or not self.session_start_time:
+            return
+        self._session_saved = True
+        _SESSION_WRITER.submit(self._update_session, int(self.total_elapsed), completed)
+
+    def _insert_session(self, workout_name, start_time):
+        # Insert session record (runs in writer thread)
+        try:
+            self.session_id = self.db.add_workout_session(workout_name, start_time, 0, False)
+        except sqlite3.Error as e:
+            print(f"Session save error: {e}")
+
+    def _update_session(self, duration, completed):
+        # Update session record (runs in writer thread, insert already done)
+        if not self.session_id:  # Insert failed
+            return
+        try:
+            self.db.update_workout_session(self.session_id, duration, completed)
+        except sqlite3.Error as e:
+            print(f"Session save error: {e}")
+
+    def destroy(self):
+        # Close database with the window, after pending session write
+        self._alive = False
+        self.stop_video_playback()
+        if self._rest_after_id:
+            self.after_cancel(self._rest_after_id)
+        self._discard_capture(self._next_capture)
+        self._next_capture = None
+        _SESSION_WRITER.submit(self.db.close)
+        super().destroy()
+
     def on_close(self):
         # Window close handler
         # Stop video
-        self.stop_video_thread = True
+        self.stop_video_playback()
         self.is_resting = False  # Stop rest countdown
 
         if self.video_capture:
@@ -463,15 +629,7 @@ class WorkoutPlayer(ctk.CTkToplevel):
             self.video_capture = None
 
         # Save partial progress
-        if self.session_id:
-            try:
-                self.db.update_workout_session(
-                    self.session_id,
-                    int(self.total_elapsed),
-                    False  # Not completed
-                )
-            except:
-                pass
+        self.save_session(False)  # Not completed
 
         try:
             self.destroy()
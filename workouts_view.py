@@ -4,6 +4,7 @@
 # ============================================================
 
 import customtkinter as ctk
+from tkinter import messagebox, TclError
 from models import DataManager, Workout
 from utils import format_duration
 
@@ -15,7 +16,11 @@ class WorkoutsView(ctk.CTkFrame):
         super().__init__(master)  # Initialize parent
 
         self.master_window = master  # Reference to main
-        self.data_manager = DataManager()  # Data manager instance
+        self.data_manager = DataManager.shared()  # Shared data manager
+        self._workouts = []  # Workouts shown in the list
+        self._rows = []  # Row widgets, reused between refreshes
+        self._empty_label = None  # "No workouts" message
+        self._name_font = ctk.CTkFont(size=16)  # Workout name, shared by all rows
 
         # Title
         self.label = ctk.CTkLabel(
@@ -33,72 +38,94 @@ class WorkoutsView(ctk.CTkFrame):
 
     def load_workouts(self):
         #Load and display workouts
-        # Clear existing widgets
-        for widget in self.workouts_frame.winfo_children():  # Get all children
-            widget.destroy()  # Remove each widget
+        self._workouts = self.data_manager.load_workouts()  # Load from JSON
+        self.render_workouts()
 
-        workouts = self.data_manager.load_workouts()  # Load from JSON
+    def render_workouts(self):
+        #Display workouts from self._workouts (rows are reused)
+        workouts = self._workouts
 
         if not workouts:  # No workouts
-            label = ctk.CTkLabel(
-                self.workouts_frame,
-                text="No workouts. Create your first one",
-                font=ctk.CTkFont(size=16)
-            )
-            label.pack(pady=50)
+            for row in self._rows:
+                row.pack_forget()  # Hide unused rows
+            if not self._empty_label:
+                self._empty_label = ctk.CTkLabel(
+                    self.workouts_frame,
+                    text="No workouts. Create your first one",
+                    font=self._name_font
+                )
+            self._empty_label.pack(pady=50)
             return
 
-        for i, workout in enumerate(workouts):
-            self.create_workout_row(workout, i)  # Create row widget
+        if self._empty_label:
+            self._empty_label.pack_forget()  # Hide empty message
+
+        while len(self._rows) < len(workouts):  # Create missing rows once
+            self._rows.append(self.create_workout_row())
+
+        for i, (row, workout) in enumerate(zip(self._rows, workouts)):
+            self.update_workout_row(row, workout, i)  # Fill row
+            if not row.winfo_manager():  # Hidden before
+                row.pack(fill="x", pady=5, padx=10)
+
+        for row in self._rows[len(workouts):]:
+            row.pack_forget()  # Hide surplus rows
 
-    def create_workout_row(self, workout, index):
-        #Create workout row
+    def create_workout_row(self):
+        #Create empty workout row
         row = ctk.CTkFrame(self.workouts_frame)
-        row.pack(fill="x", pady=5, padx=10)
 
         # Name
-        name = workout.name if workout.name else "Untitled"  # Get name or default
-        label_name = ctk.CTkLabel(
+        row.label_name = ctk.CTkLabel(
             row,
-            text=name,  # Workout name
-            font=ctk.CTkFont(size=16),
+            text="",  # Workout name
+            font=self._name_font,
             anchor="w"
         )
-        label_name.pack(side="left", padx=10, fill="x", expand=True)  # Take remaining space
+        row.label_name.pack(side="left", padx=10, fill="x", expand=True)  # Take remaining space
 
         # Time
-        total_seconds = workout.get_total_duration()  # Get total seconds
-        time_text = format_duration(total_seconds)  # Format duration
-
-        label_time = ctk.CTkLabel(row, text=time_text, width=100)  # Time label
-        label_time.pack(side="left", padx=10)
+        row.label_time = ctk.CTkLabel(row, text="", width=100)  # Time label
+        row.label_time.pack(side="left", padx=10)
 
         # Buttons
-        btn_start = ctk.CTkButton(
+        row.btn_start = ctk.CTkButton(
             row,
             text="Start",
-            width=80,
-            command=lambda: self.start_workout(workout)  # Start handler
+            width=80
         )
-        btn_start.pack(side="right", padx=5)
+        row.btn_start.pack(side="right", padx=5)
 
-        btn_delete = ctk.CTkButton(
+        row.btn_delete = ctk.CTkButton(
             row,
             text="Delete",
             width=80,
             fg_color="red",  # Red button
-            hover_color="darkred",  # Dark red hover
-            command=lambda: self.delete_workout(index)  # Delete handler
+            hover_color="darkred"  # Dark red hover
         )
-        btn_delete.pack(side="right", padx=5)
+        row.btn_delete.pack(side="right", padx=5)
 
-        btn_edit = ctk.CTkButton(
+        row.btn_edit = ctk.CTkButton(
             row,
             text="Edit",
-            width=120,
-            command=lambda: self.edit_workout(workout, index)  # Edit handler
+            width=120
         )
-        btn_edit.pack(side="right", padx=5)
+        row.btn_edit.pack(side="right", padx=5)
+        return row
+
+    def update_workout_row(self, row, workout, index):
+        #Show workout in row
+        name = workout.name if workout.name else "Untitled"  # Get name or default
+        row.label_name.configure(text=name)
+
+        # Time
+        total_seconds = workout.get_total_duration()  # Get total seconds
+        row.label_time.configure(text=format_duration(total_seconds))  # Format duration
+
+        # Button handlers
+        row.btn_start.configure(command=lambda: self.start_workout(workout))  # Start handler
+        row.btn_delete.configure(command=lambda: self.delete_workout(index))  # Delete handler
+        row.btn_edit.configure(command=lambda: self.edit_workout(workout, index))  # Edit handler
 
     def start_workout(self, workout):
         #Start workout
@@ -108,13 +135,13 @@ class WorkoutsView(ctk.CTkFrame):
     def edit_workout(self, workout, index):
         #Edit workout
         from workout_editor import WorkoutEditor  # Import editor
-        editor = WorkoutEditor(self.master_window, workout, index)  # Open editor
+        editor = WorkoutEditor(self.master_window, workout, index, data_manager=self.data_manager)  # Open editor
         editor.wait_window()  # Wait for close
         self.load_workouts()  # Refresh list
 
     def delete_workout(self, index):
         #Delete workout
-        workouts = self.data_manager.load_workouts()  # Load all workouts
+        workouts = self._workouts  # Already loaded for the list
 
         if 0 <= index < len(workouts):  # Valid index
             # Delete confirmation
@@ -125,5 +152,15 @@ class WorkoutsView(ctk.CTkFrame):
 
             if dialog.get_input() == "yes":  # User confirmed
                 workouts.pop(index)  # Remove workout
-                self.data_manager.save_workouts(workouts)  # Save to file
-                self.load_workouts()  # Refresh list
\ No newline at end of file
+                future = self.data_manager.delete_workout(index)  # Save to file in background
+                future.add_done_callback(self._on_workouts_written)
+                self.render_workouts()  # Refresh list, no re-read
+
+    def _on_workouts_written(self, future):
+        #Report failed write (runs in writer thread)
+        error = future.exception()
+        if error:
+            try:
+                self.after(0, messagebox.showerror, "Save Failed", f"Cannot save workouts:\n{error}")
+            except (RuntimeError, TclError):
+                pass  # Application closed
\ No newline at end of file